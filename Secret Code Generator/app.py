@@ -1,42 +1,568 @@
+import argparse  # Importing argparse to parse command-line options for the streaming mode
+import mmap  # Importing mmap to transform files in place without reading them into memory
+import os  # Importing os to walk directories and count CPU cores for the parallel mode
 import string  # Importing the string module to access predefined sets of characters
+import sys  # Importing sys to access stdin/stdout as binary streams
+import time  # Importing time to measure throughput of the parallel mode
+from collections import deque  # Importing deque to keep a bounded window of pending chunks
+from concurrent.futures import ProcessPoolExecutor  # Importing the process pool for parallel jobs
 
+try:
+    import numpy as np  # NumPy is only needed for cracking messages with an unknown shift
+except ImportError:
+    np = None
+
+# Making the shared instrumentation module at the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402  Importing the profiling switch for the --profile flag
+from instrumentation import count, timed, timer  # noqa: E402  Importing the profiling hooks (no-ops unless profiling is on)
+
+def _build_tables(shift):
+    """
+    Function to build the translation tables for a single shift value.
+
+    Both tables only touch ASCII letters, so every other character (or byte)
+    passes through unchanged, exactly like the character-by-character loop.
+
+    :param shift: The number of positions each letter should be shifted (integer).
+    :return: A tuple of (str table for str.translate, bytes table for bytes.translate).
+    """
+    shift %= 26  # Negative and oversized shifts wrap around the alphabet
+    lower = string.ascii_lowercase
+    upper = string.ascii_uppercase
+    shifted_lower = lower[shift:] + lower[:shift]
+    shifted_upper = upper[shift:] + upper[:shift]
+
+    str_table = str.maketrans(lower + upper, shifted_lower + shifted_upper)
+    bytes_table = bytes.maketrans((lower + upper).encode("ascii"),
+                                  (shifted_lower + shifted_upper).encode("ascii"))
+    return str_table, bytes_table
+
+
+# Precomputing the tables for all 26 possible shifts once at import time
+_SHIFT_TABLES = [_build_tables(shift) for shift in range(26)]
+
+# Default chunk size (in bytes) used when streaming files or stdin
+CHUNK_SIZE = 64 * 1024
+
+# Default chunk size (in bytes) handed to each worker process in the parallel mode
+PARALLEL_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def get_tables(shift, mode='encode'):
+    """
+    Function to look up the precomputed translation tables for a shift and mode.
+
+    :param shift: The number of positions each letter should be shifted (integer).
+    :param mode: Determines whether to 'encode' (default) or 'decode' the message.
+    :return: A tuple of (str table, bytes table).
+    """
+    # If the mode is 'decode', we reverse the shift direction
+    if mode == 'decode':
+        shift = -shift
+    return _SHIFT_TABLES[shift % 26]
+
+
+def _require_numpy():
+    """
+    Function to make sure NumPy is available before cracking or using keyed ciphers.
+
+    :raises RuntimeError: If NumPy is not installed.
+    """
+    if np is None:
+        raise RuntimeError("This feature requires NumPy. Install it with: pip install numpy")
+
+
+@timed("cipher.caesar_cipher")
 def caesar_cipher(text, shift, mode='encode'):
     """
     Function to encode or decode a message using the Caesar cipher.
     
-    :param text: The input message (string) to be encoded or decoded.
+    :param text: The input message (string, bytes, bytearray or memoryview) to be encoded or decoded.
     :param shift: The number of positions each letter should be shifted (integer).
     :param mode: Determines whether to 'encode' (default) or 'decode' the message.
-    :return: The transformed (encoded or decoded) message.
+    :return: The transformed message; a string for string input, otherwise bytes/bytearray.
     """
+    str_table, bytes_table = get_tables(shift, mode)
 
-    # Storing all lowercase letters in a variable for reference
-    alphabet = string.ascii_lowercase  
-    
-    # If the mode is 'decode', we reverse the shift direction
-    if mode == 'decode':
-        shift = -shift  
-    
-    # Initializing an empty string to store the resulting message
-    result = ""
-
-    # Iterating through each character in the input text
-    for char in text:
-        # Checking if the character is a letter in the alphabet (ignoring punctuation, numbers, spaces)
-        if char.lower() in alphabet:
-            is_upper = char.isupper()  # Checking if the original character is uppercase
-
-            # Finding the new index by shifting and ensuring it wraps around using modulo
-            new_index = (alphabet.index(char.lower()) + shift) % 26
-            new_char = alphabet[new_index]  # Getting the new shifted letter
-            
-            # Preserving the original case of the letter
-            result += new_char.upper() if is_upper else new_char
-        else:
-            result += char  # Keeping non-alphabetic characters unchanged
-    
-    # Returning the final transformed message
-    return result
+    # Translating the whole message in one pass; letters keep their case and
+    # punctuation, numbers and spaces are left unchanged
+    if isinstance(text, str):
+        return text.translate(str_table)
+    if isinstance(text, memoryview):
+        text = text.tobytes()
+    return text.translate(bytes_table)
+
+
+def _key_shifts(key):
+    """
+    Function to turn a Vigenère key into the list of shifts it stands for.
+
+    Only the letters of the key are used ('a' = 0, 'b' = 1, ...), case is ignored.
+
+    :param key: The keyword (string).
+    :return: A list of shifts (integers between 0 and 25).
+    :raises ValueError: If the key does not contain any letter.
+    """
+    shifts = [ord(char) - ord('a') for char in key.lower() if char in string.ascii_lowercase]
+    if not shifts:
+        raise ValueError("The key must contain at least one letter.")
+    return shifts
+
+
+class CaesarCodec:
+    """
+    Streaming codec for the Caesar cipher.
+
+    Every codec offers the same two methods, so the streaming, in-place and mmap
+    helpers below work with any cipher:
+    transform(chunk) returns the transformed bytes, and transform_into(view)
+    rewrites a writable buffer in place.
+    """
+
+    def __init__(self, shift, mode='encode'):
+        self.table = get_tables(shift, mode)[1]
+
+    def transform(self, chunk):
+        if isinstance(chunk, memoryview):
+            chunk = chunk.tobytes()
+        return chunk.translate(self.table)
+
+    def transform_into(self, view):
+        view[:] = view.tobytes().translate(self.table)
+
+
+class VigenereCodec:
+    """
+    Streaming codec for the Vigenère cipher (requires NumPy).
+
+    Only letters move the key forward, just like the Caesar cipher only touches
+    letters. The key position is remembered between chunks, so a message can be
+    transformed in pieces and still give the same result as in one go.
+    """
+
+    def __init__(self, key, mode='encode'):
+        _require_numpy()
+        shifts = np.array(_key_shifts(key), dtype=np.int16)
+        # If the mode is 'decode', we reverse the shift direction
+        self.shifts = (-shifts) % 26 if mode == 'decode' else shifts
+        self.position = 0  # Number of letters transformed so far
+
+    def _apply(self, data):
+        """Shift the letters of a uint8 NumPy array in place."""
+        lowered = data | 0x20
+        positions = np.flatnonzero((lowered >= ord('a')) & (lowered <= ord('z')))
+        if not len(positions):
+            return
+
+        key_index = (self.position + np.arange(len(positions))) % len(self.shifts)
+        letters = data[positions]
+        shifted = (letters.astype(np.int16) | 0x20) - ord('a') + self.shifts[key_index]
+
+        # Rebuilding the lowercase letter, then clearing bit 0x20 again for uppercase ones
+        data[positions] = ((shifted % 26 + ord('a')) & ~0x20) | (letters & 0x20)
+        self.position += len(positions)
+
+    def transform(self, chunk):
+        data = np.frombuffer(chunk, dtype=np.uint8).copy()
+        self._apply(data)
+        return data.tobytes()
+
+    def transform_into(self, view):
+        self._apply(np.frombuffer(view, dtype=np.uint8))
+
+
+def vigenere_cipher(text, key, mode='encode'):
+    """
+    Function to encode or decode a message using the Vigenère cipher.
+
+    :param text: The input message (string, bytes, bytearray or memoryview).
+    :param key: The keyword; each of its letters is the shift for one letter of the message.
+    :param mode: Determines whether to 'encode' (default) or 'decode' the message.
+    :return: The transformed message; a string for string input, otherwise bytes.
+    """
+    codec = VigenereCodec(key, mode)
+    if isinstance(text, str):
+        # Only ASCII letters change, so going through UTF-8 keeps every other character intact
+        return codec.transform(text.encode("utf-8")).decode("utf-8")
+    return codec.transform(text)
+
+
+@timed("cipher.codec_stream")
+def codec_stream(codec, source, destination, chunk_size=CHUNK_SIZE):
+    """
+    Function to run a codec over a binary stream chunk by chunk.
+
+    Only ASCII letters are rewritten, so UTF-8 text can be cut at any byte
+    boundary without corrupting multi-byte characters. Memory use stays bounded
+    by chunk_size no matter how large the input is.
+
+    :param codec: A CaesarCodec or VigenereCodec.
+    :param source: A binary file object to read from.
+    :param destination: A binary file object to write the result to.
+    :param chunk_size: The number of bytes to read per chunk.
+    :return: The total number of bytes processed.
+    """
+    total = 0
+
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        with timer("cipher.transform_chunk"):
+            destination.write(codec.transform(chunk))
+        total += len(chunk)
+        count("cipher.bytes", len(chunk))
+
+    destination.flush()
+    return total
+
+
+@timed("cipher.codec_inplace")
+def codec_inplace(codec, buffer, chunk_size=CHUNK_SIZE):
+    """
+    Function to run a codec over a writable buffer without making a full copy.
+
+    Works with bytearray, writable memoryview and mmap objects. The buffer is
+    rewritten chunk by chunk, so at most chunk_size extra bytes are used.
+
+    :param codec: A CaesarCodec or VigenereCodec.
+    :param buffer: The writable buffer to transform.
+    :param chunk_size: The number of bytes to transform at a time.
+    :return: The total number of bytes processed.
+    """
+    with memoryview(buffer) as view:
+        view = view.cast('B')
+        for start in range(0, len(view), chunk_size):
+            codec.transform_into(view[start:start + chunk_size])
+        return len(view)
+
+
+def codec_mmap(codec, path, chunk_size=CHUNK_SIZE):
+    """
+    Function to transform a file in place through a memory map.
+
+    :param codec: A CaesarCodec or VigenereCodec.
+    :param path: The file to rewrite.
+    :param chunk_size: The number of bytes to transform at a time.
+    :return: The total number of bytes processed.
+    """
+    with open(path, 'r+b') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return 0  # Empty files cannot be memory-mapped
+        with mmap.mmap(file.fileno(), 0) as mapped:
+            total = codec_inplace(codec, mapped, chunk_size)
+            mapped.flush()
+            return total
+
+
+def codec_file(codec, input_path, output_path, chunk_size=CHUNK_SIZE):
+    """
+    Function to run a codec over a file, or stdin/stdout when a path is '-'.
+
+    :param codec: A CaesarCodec or VigenereCodec.
+    :param input_path: Path of the file to read, or '-' for stdin.
+    :param output_path: Path of the file to write, or '-' for stdout.
+    :param chunk_size: The number of bytes to read per chunk.
+    :return: The total number of bytes processed.
+    """
+    source = sys.stdin.buffer if input_path == '-' else open(input_path, 'rb')
+    try:
+        destination = sys.stdout.buffer if output_path == '-' else open(output_path, 'wb')
+        try:
+            return codec_stream(codec, source, destination, chunk_size)
+        finally:
+            if destination is not sys.stdout.buffer:
+                destination.close()
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+
+
+def caesar_stream(source, destination, shift, mode='encode', chunk_size=CHUNK_SIZE):
+    """
+    Function to encode or decode a binary stream chunk by chunk with the Caesar cipher.
+
+    :param source: A binary file object to read from.
+    :param destination: A binary file object to write the result to.
+    :param shift: The number of positions each letter should be shifted (integer).
+    :param mode: Determines whether to 'encode' (default) or 'decode' the message.
+    :param chunk_size: The number of bytes to read per chunk.
+    :return: The total number of bytes processed.
+    """
+    return codec_stream(CaesarCodec(shift, mode), source, destination, chunk_size)
+
+
+def caesar_file(input_path, output_path, shift, mode='encode', chunk_size=CHUNK_SIZE):
+    """
+    Function to encode or decode a file, or stdin/stdout when a path is '-'.
+
+    :param input_path: Path of the file to read, or '-' for stdin.
+    :param output_path: Path of the file to write, or '-' for stdout.
+    :param shift: The number of positions each letter should be shifted (integer).
+    :param mode: Determines whether to 'encode' (default) or 'decode' the message.
+    :param chunk_size: The number of bytes to read per chunk.
+    :return: The total number of bytes processed.
+    """
+    return codec_file(CaesarCodec(shift, mode), input_path, output_path, chunk_size)
+
+
+def _translate_chunk(chunk, shift, mode):
+    """
+    Worker function that encodes or decodes one chunk of bytes in a child process.
+
+    :param chunk: The bytes to transform.
+    :param shift: The number of positions each letter should be shifted (integer).
+    :param mode: Determines whether to 'encode' or 'decode' the chunk.
+    :return: The transformed bytes.
+    """
+    return caesar_cipher(chunk, shift, mode)
+
+
+def _translate_file(input_path, output_path, shift, mode, chunk_size):
+    """
+    Worker function that encodes or decodes one whole file in a child process.
+
+    :return: The number of bytes processed.
+    """
+    # Creating the output folder here so workers never race on the same directory
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    return caesar_file(input_path, output_path, shift, mode, chunk_size)
+
+
+def parallel_file(input_path, output_path, shift, mode='encode', workers=None,
+                  chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Function to encode or decode one large file by spreading its chunks over a process pool.
+
+    Chunks are written in their original order. At most two chunks per worker are
+    in flight at any time, so memory use stays bounded for huge files.
+
+    :param input_path: Path of the file to read, or '-' for stdin.
+    :param output_path: Path of the file to write, or '-' for stdout.
+    :param shift: The number of positions each letter should be shifted (integer).
+    :param mode: Determines whether to 'encode' (default) or 'decode' the message.
+    :param workers: The number of worker processes (defaults to the number of CPUs).
+    :param chunk_size: The number of bytes handed to a worker at a time.
+    :return: The total number of bytes processed.
+    """
+    workers = workers or os.cpu_count() or 1
+    source = sys.stdin.buffer if input_path == '-' else open(input_path, 'rb')
+    destination = sys.stdout.buffer if output_path == '-' else open(output_path, 'wb')
+    total = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            while True:
+                chunk = source.read(chunk_size)
+                if chunk:
+                    pending.append(pool.submit(_translate_chunk, chunk, shift, mode))
+                    total += len(chunk)
+
+                # Writing finished chunks in order once the window is full or the input ended
+                while pending and (not chunk or len(pending) >= 2 * workers):
+                    destination.write(pending.popleft().result())
+
+                if not chunk:
+                    break
+        destination.flush()
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if destination is not sys.stdout.buffer:
+            destination.close()
+
+    return total
+
+
+def parallel_directory(input_dir, output_dir, shift, mode='encode', workers=None,
+                       chunk_size=CHUNK_SIZE):
+    """
+    Function to encode or decode every file below a directory using a process pool.
+
+    The folder structure of input_dir is mirrored inside output_dir.
+
+    :param input_dir: The directory holding the files to transform.
+    :param output_dir: The directory the transformed files are written to.
+    :param shift: The number of positions each letter should be shifted (integer).
+    :param mode: Determines whether to 'encode' (default) or 'decode' the files.
+    :param workers: The number of worker processes (defaults to the number of CPUs).
+    :param chunk_size: The number of bytes each worker reads at a time.
+    :return: The total number of bytes processed.
+    """
+    jobs = []
+    for root, _, files in os.walk(input_dir):
+        for name in sorted(files):
+            input_path = os.path.join(root, name)
+            output_path = os.path.join(output_dir, os.path.relpath(input_path, input_dir))
+            jobs.append((input_path, output_path))
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        sizes = pool.map(_translate_file,
+                         [job[0] for job in jobs], [job[1] for job in jobs],
+                         [shift] * len(jobs), [mode] * len(jobs), [chunk_size] * len(jobs))
+        return sum(sizes)
+
+
+@timed("cipher.parallel_caesar")
+def parallel_caesar(input_path, output_path, shift, mode='encode', workers=None, chunk_size=None):
+    """
+    Function to run the parallel mode on a file or directory and measure its throughput.
+
+    :param input_path: A file, a directory, or '-' for stdin.
+    :param output_path: A file (or directory when input_path is a directory), or '-' for stdout.
+    :param shift: The number of positions each letter should be shifted (integer).
+    :param mode: Determines whether to 'encode' (default) or 'decode' the input.
+    :param workers: The number of worker processes (defaults to the number of CPUs).
+    :param chunk_size: The number of bytes per chunk (defaults depend on the input type).
+    :return: A tuple of (bytes processed, seconds taken, throughput in MB/s).
+    """
+    start = time.perf_counter()
+    if os.path.isdir(input_path):
+        total = parallel_directory(input_path, output_path, shift, mode, workers,
+                                   chunk_size or CHUNK_SIZE)
+    else:
+        total = parallel_file(input_path, output_path, shift, mode, workers,
+                              chunk_size or PARALLEL_CHUNK_SIZE)
+    elapsed = time.perf_counter() - start
+
+    throughput = total / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    return total, elapsed, throughput
+
+
+# Relative frequency of each letter a-z in typical English text
+ENGLISH_FREQUENCIES = [
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+]
+
+
+def _as_bytes(text):
+    """
+    Function to view a message as bytes without changing its letters.
+
+    :param text: The message (string, bytes or bytearray).
+    :return: The message as bytes (UTF-8 encoded if it was a string).
+    """
+    if isinstance(text, str):
+        return text.encode("utf-8")
+    return bytes(text)
+
+
+def letter_counts(messages):
+    """
+    Function to count the letters a-z in many messages with one NumPy pass.
+
+    All messages are joined into a single buffer, every byte is tagged with the
+    number of the message it came from, and one bincount produces the whole
+    (messages x 26) histogram. Upper and lower case letters are counted together.
+
+    :param messages: A list of messages (strings or bytes).
+    :return: A NumPy array of shape (len(messages), 26) with the letter counts.
+    """
+    _require_numpy()
+    encoded = [_as_bytes(message) for message in messages]
+    lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=len(encoded))
+
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    owners = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+
+    # Setting bit 0x20 turns 'A'-'Z' into 'a'-'z', so one range check finds all letters
+    lowered = buffer | 0x20
+    is_letter = (lowered >= ord('a')) & (lowered <= ord('z'))
+    bins = owners[is_letter] * 26 + (lowered[is_letter] - ord('a'))
+
+    counts = np.bincount(bins, minlength=len(encoded) * 26)
+    return counts.reshape(len(encoded), 26)
+
+
+def chi_squared_scores(counts):
+    """
+    Function to score every possible shift against English letter frequencies.
+
+    For shift s, plaintext letter i was encoded as letter (i + s) % 26, so the
+    observed counts are rotated by s and compared with the expected counts.
+    A lower score means the decoded text looks more like English.
+
+    :param counts: A NumPy array of shape (n, 26) from letter_counts().
+    :return: A NumPy array of shape (n, 26) with one chi-squared score per shift.
+    """
+    _require_numpy()
+    counts = np.asarray(counts, dtype=np.float64)
+    frequencies = np.asarray(ENGLISH_FREQUENCIES, dtype=np.float64)
+
+    # rotation[s, i] is the cipher letter that plaintext letter i becomes with shift s
+    rotation = (np.arange(26)[:, None] + np.arange(26)[None, :]) % 26
+    observed = counts[:, rotation]                                  # (n, 26 shifts, 26 letters)
+    expected = counts.sum(axis=1)[:, None, None] * frequencies     # (n, 1, 26)
+
+    # Messages without any letters get a score of 0 for every shift
+    terms = np.divide((observed - expected) ** 2, expected,
+                      out=np.zeros(observed.shape), where=expected > 0)
+    return terms.sum(axis=2)
+
+
+@timed("cipher.crack_batch")
+def crack_batch(messages):
+    """
+    Function to find the most likely shift of many messages at once.
+
+    :param messages: A list of encoded messages (strings or bytes).
+    :return: A list of (shift, decoded message) tuples, one per message.
+    """
+    if not messages:
+        return []
+
+    shifts = chi_squared_scores(letter_counts(messages)).argmin(axis=1)
+
+    # Decoding with caesar_cipher keeps the same case and punctuation rules as mode='decode'
+    return [(int(shift), caesar_cipher(message, int(shift), 'decode'))
+            for shift, message in zip(shifts, messages)]
+
+
+def crack_caesar(text):
+    """
+    Function to decode a single message without knowing its shift.
+
+    :param text: The encoded message (string or bytes).
+    :return: A tuple of (most likely shift, decoded message).
+    """
+    return crack_batch([text])[0]
+
+
+def crack_file(input_path, output_path, show_shift=False):
+    """
+    Function to crack a batch file holding one encoded message per line.
+
+    :param input_path: Path of the file to read, or '-' for stdin.
+    :param output_path: Path of the file to write, or '-' for stdout.
+    :param show_shift: Whether to prefix every decoded line with its shift and a tab.
+    :return: The number of messages cracked.
+    """
+    if input_path == '-':
+        data = sys.stdin.buffer.read()
+    else:
+        with open(input_path, 'rb') as source:
+            data = source.read()
+
+    messages = data.splitlines(keepends=True)
+    results = crack_batch(messages)
+
+    destination = sys.stdout.buffer if output_path == '-' else open(output_path, 'wb')
+    try:
+        for shift, decoded in results:
+            if show_shift:
+                destination.write(b"%d\t" % shift)
+            destination.write(decoded)
+        destination.flush()
+    finally:
+        if destination is not sys.stdout.buffer:
+            destination.close()
+
+    return len(results)
 
 
 def get_valid_shift():
@@ -77,7 +603,7 @@ def main():
     """
     Main function to run the Secret Code Generator program.
     
-    Provides a user menu to choose between encoding, decoding, or exiting.
+    Provides a user menu to choose between encoding, decoding, cracking, or exiting.
     Uses a loop to keep running until the user chooses to exit.
     """
     while True:  # Infinite loop to keep the program running until the user exits
@@ -85,9 +611,10 @@ def main():
         print("1. Encode a message")
         print("2. Decode a message")
         print("3. Exit")
+        print("4. Crack a message (unknown shift)")
 
         # Handling user input to choose an option
-        choice = handle_input("Choose an option (1/2/3): ")
+        choice = handle_input("Choose an option (1/2/3/4): ")
 
         if choice == '1':  # User chooses to encode a message
             message = handle_input("Enter the message to encode: ")
@@ -102,9 +629,93 @@ def main():
         elif choice == '3':  # User chooses to exit the program
             print("Exiting the program. Goodbye!")
             break  # Exits the loop, terminating the program
+
+        elif choice == '4':  # User chooses to crack a message without knowing the shift
+            message = handle_input("Enter the message to crack: ")
+            try:
+                shift, decoded = crack_caesar(message)
+            except RuntimeError as error:  # NumPy is not installed
+                print(error)
+                continue
+            print(f"Most likely shift: {shift}")
+            print("Decoded Message:", decoded)
         
         else:
-            print("Invalid choice! Please enter 1, 2, or 3.")  # Handles invalid input
+            print("Invalid choice! Please enter 1, 2, 3, or 4.")  # Handles invalid input
+
+def stream_main(argv=None):
+    """
+    Non-interactive entry point that encodes or decodes a file, a directory or stdin.
+
+    Examples: python app.py --shift 3 --decode secret.txt -o plain.txt
+              python app.py --shift 3 --jobs 8 logs/ -o encoded_logs/
+              python app.py --key lemon --in-place huge.log
+              python app.py --crack messages.txt -o plain.txt
+
+    :param argv: The list of command-line arguments (defaults to sys.argv[1:]).
+    """
+    parser = argparse.ArgumentParser(description="Caesar cipher streaming encoder/decoder.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="Input file or directory (default: stdin).")
+    parser.add_argument("-o", "--output", default="-",
+                        help="Output file, or directory for a directory input (default: stdout).")
+    parser.add_argument("-s", "--shift", type=int, help="Shift number.")
+    parser.add_argument("-k", "--key", help="Use the Vigenère cipher with this keyword instead of a shift.")
+    parser.add_argument("-d", "--decode", action="store_true", help="Decode instead of encode.")
+    parser.add_argument("--in-place", action="store_true",
+                        help="Rewrite the input file itself through a memory map.")
+    parser.add_argument("--crack", action="store_true",
+                        help="Decode one message per line without knowing the shift.")
+    parser.add_argument("--show-shift", action="store_true",
+                        help="With --crack, prefix each line with the shift that was found.")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Use a pool of worker processes (0 = off, -1 = one per CPU).")
+    parser.add_argument("--chunk-size", type=int, help="Bytes read per chunk.")
+    args = parser.parse_args(argv)
+
+    if args.crack:
+        try:
+            crack_file(args.input, args.output, args.show_shift)
+        except RuntimeError as error:  # NumPy is not installed
+            parser.error(str(error))
+        return
+    if args.shift is None and args.key is None:
+        parser.error("--shift or --key is required unless --crack is used")
+
+    mode = 'decode' if args.decode else 'encode'
+    try:
+        codec = VigenereCodec(args.key, mode) if args.key is not None else CaesarCodec(args.shift, mode)
+    except (ValueError, RuntimeError) as error:
+        parser.error(str(error))
+
+    if args.in_place:
+        if args.input == '-' or os.path.isdir(args.input):
+            parser.error("--in-place needs a single input file")
+        codec_mmap(codec, args.input, args.chunk_size or CHUNK_SIZE)
+        return
+
+    is_directory = os.path.isdir(args.input)
+    if is_directory and args.output == '-':
+        parser.error("an output directory (-o) is required when the input is a directory")
+
+    if args.jobs or is_directory:
+        if args.key is not None:
+            # The Vigenère key position depends on every letter before a chunk
+            parser.error("--jobs and directory inputs only support the Caesar cipher")
+        workers = args.jobs if args.jobs > 0 else None
+        total, elapsed, throughput = parallel_caesar(args.input, args.output, args.shift, mode,
+                                                     workers, args.chunk_size)
+        # Reporting on stderr so the report never mixes with output written to stdout
+        print(f"Processed {total / (1024 * 1024):.2f} MB in {elapsed:.2f} s "
+              f"({throughput:.2f} MB/s)", file=sys.stderr)
+    else:
+        codec_file(codec, args.input, args.output, args.chunk_size or CHUNK_SIZE)
+
 
 if __name__ == "__main__":
-    main()
+    # Taking out --profile, then running the interactive menu unless other arguments were given
+    argv = instrumentation.configure()
+    if argv:
+        stream_main(argv)
+    else:
+        main()
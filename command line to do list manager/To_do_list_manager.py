@@ -1,22 +1,767 @@
+import argparse
+import codecs
 import json
 import os
 import csv
+import re
+import shlex
+import shutil
+import hashlib
+import heapq
+import sqlite3
+import sys
+import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import groupby, islice
 
-FILENAME = "tasks.json"
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from instrumentation import timed  # noqa: E402
+
+# Snapshot file; a ".jsonl" name stores one task per line instead of a JSON array
+FILENAME = os.environ.get("TODO_FILE", "tasks.json")
 PRIORITY_LEVELS = ["Low", "Medium", "High"]
 
-# Load tasks from file
-def load_tasks():
+# Append-only journal of changes made since the last snapshot in FILENAME
+JOURNAL_FILENAME = FILENAME + ".journal"
+# Persisted search index, valid for the snapshot digest stored inside it
+# Fold the journal back into the snapshot after this many changes
+COMPACT_EVERY = 1000
+
+# Digest of the snapshot the journal is based on and number of journaled changes
+journal_state = {"snapshot": None, "entries": 0}
+
+# Storage engine: "json" (FILENAME + journal) or "sqlite" (DB_FILENAME)
+STORAGE = os.environ.get("TODO_STORAGE", "json")
+DB_FILENAME = FILENAME + ".db"
+
+# The tasks table; AUTOINCREMENT keeps the IDs of deleted tasks from being reused
+TASKS_TABLE = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    description TEXT NOT NULL,
+    due_date TEXT,
+    due_day TEXT,
+    priority TEXT NOT NULL DEFAULT 'Medium',
+    completed INTEGER NOT NULL DEFAULT 0
+)"""
+TASK_COLUMNS = "id, description, due_date, due_day, priority, completed"
+# Open SQLite connection, created on first use
+db_state = {"con": None}
+
+# While a batch runs, changes stay in memory and are persisted once at the end
+batch_state = {"active": False}
+
+# Bytes read at a time when streaming task files
+READ_CHUNK_SIZE = 1 << 16
+# Colors only go to a terminal, and never when NO_COLOR is set
+COLOR_OUTPUT = sys.stdout.isatty() and "NO_COLOR" not in os.environ
+# Listings written in one go are joined this many rows at a time
+RENDER_BATCH = 10000
+# Orders a listing can be sorted in (None keeps the listing's own order)
+SORT_ORDERS = (None, "due", "priority")
+PRIORITY_RANK = {priority: rank for rank, priority in enumerate(reversed(PRIORITY_LEVELS))}
+# The same orders in SQL; unknown priorities and missing or malformed due dates come last
+SQL_ORDERS = {
+    "due": "due_day IS NULL, due_day, id",
+    "priority": "CASE priority WHEN 'High' THEN 0 WHEN 'Medium' THEN 1 WHEN 'Low' THEN 2 ELSE 3 END, "
+                "due_day IS NULL, due_day, id",
+}
+# Print a progress line every this many tasks when converting, importing or exporting
+PROGRESS_EVERY = 100000
+
+# Wrap text in an ANSI color code when writing to a terminal
+def color(text, code):
+    return f"\033[{code}m{text}\033[0m" if COLOR_OUTPUT else text
+
+# Parse a due date string once; repeated dates are served from the cache
+@lru_cache(maxsize=4096)
+def parse_due_date(due_date):
+    if not due_date:
+        return None
+    try:
+        return datetime.strptime(due_date, "%Y-%m-%d").date()
+    except ValueError:
+        return None  # Malformed dates are shown as-is but never count as due
+
+# The due date as stored for SQLite queries: ISO YYYY-MM-DD, or None when missing or malformed
+def due_day(due_date):
+    due = parse_due_date(due_date)
+    return due.isoformat() if due else None
+
+# Compact task record: fixed slots instead of a per-task dict, due date parsed once
+class Task:
+    __slots__ = ("description", "due_date", "priority", "completed", "due", "id")
+
+    def __init__(self, description, due_date=None, priority="Medium", completed=False, id=None):
+        # Due dates and priorities repeat a lot, so all tasks share one copy of each string
+        due_date = sys.intern(due_date) if due_date else None
+        self.description = description
+        self.due_date = due_date
+        self.due = parse_due_date(due_date)
+        self.priority = sys.intern(priority)
+        self.completed = completed
+        self.id = id
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["description"], data.get("due_date"), data.get("priority", "Medium"),
+                   data.get("completed", False), data.get("id"))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "description": self.description,
+            "due_date": self.due_date,
+            "priority": self.priority,
+            "completed": self.completed,
+        }
+
+    # Apply changed fields, re-parsing the due date when it changes
+    def update(self, fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        if "due_date" in fields:
+            self.due = parse_due_date(self.due_date)
+
+# Tasks in insertion order, addressed by a stable ID through a hash map.
+# Deleting from a dict leaves a tombstone in its entry table instead of shifting
+# later entries, so lookups, updates and deletes are all O(1). next_id is the
+# high-water mark: the storage engines persist it so that a deleted task's ID is
+# never handed out again.
+class TaskList:
+    def __init__(self, tasks=()):
+        self.by_id = {}
+        self.next_id = 1
+        for task in tasks:
+            self.append(task)
+
+    # Add a task, giving it the next free ID if it has none (or a duplicate one)
+    def append(self, task):
+        if task.id is None or task.id in self.by_id:
+            task.id = self.next_id
+        self.next_id = max(self.next_id, task.id + 1)
+        self.by_id[task.id] = task
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def remove(self, task_id):
+        return self.by_id.pop(task_id)
+
+    # The task at a list position; only needed to replay journals written before task IDs existed
+    def nth(self, position):
+        return next(islice(self.by_id.values(), position, None))
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
+
+# Tasks with a valid due date, kept sorted by (due date, task ID)
+class DueDateIndex:
+    def __init__(self, tasks=()):
+        entries = sorted(((task.due, task.id), task) for task in tasks if task.due)
+        self.keys = [key for key, _ in entries]
+        self.tasks = [task for _, task in entries]
+        self.key_of = {task.id: key for key, task in entries}
+
+    def add(self, task):
+        if task.due:
+            key = (task.due, task.id)
+            position = bisect_left(self.keys, key)
+            self.keys.insert(position, key)
+            self.tasks.insert(position, task)
+            self.key_of[task.id] = key
+
+    def remove(self, task):
+        key = self.key_of.pop(task.id, None)
+        if key is not None:
+            position = bisect_left(self.keys, key)
+            del self.keys[position]
+            del self.tasks[position]
+
+    def update(self, task):
+        self.remove(task)
+        self.add(task)
+
+    # Tasks due on or before the given date (includes overdue ones)
+    def due_until(self, last_day):
+        return self.tasks[:bisect_right(self.keys, (last_day, float("inf")))]
+
+    # Tasks due strictly before the given date
+    def due_before(self, day):
+        return self.tasks[:bisect_left(self.keys, (day,))]
+
+# Due-date index over the loaded tasks, kept in sync by record_change
+due_index = DueDateIndex()
+
+# Split text into lowercase word tokens
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+# Inverted index from description tokens to tasks, with a sorted vocabulary for prefix lookups
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}    # token -> set of tasks containing it
+        self.terms = {}       # task -> tokens indexed for it
+        self.vocabulary = []  # sorted list of all tokens
+
+    def rebuild(self, tasks):
+        self.postings, self.terms = {}, {}
+        for task in tasks:
+            tokens = set(tokenize(task.description))
+            self.terms[task] = tokens
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(task)
+        self.vocabulary = sorted(self.postings)
+
+    def add(self, task):
+        tokens = set(tokenize(task.description))
+        self.terms[task] = tokens
+        for token in tokens:
+            if token not in self.postings:
+                self.postings[token] = set()
+                self.vocabulary.insert(bisect_left(self.vocabulary, token), token)
+            self.postings[token].add(task)
+
+    def remove(self, task):
+        for token in self.terms.pop(task, ()):
+            matched = self.postings[token]
+            matched.discard(task)
+            if not matched:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def update(self, task):
+        self.remove(task)
+        self.add(task)
+
+    # Tokens starting with the given prefix
+    def expand(self, prefix):
+        start = bisect_left(self.vocabulary, prefix)
+        stop = bisect_left(self.vocabulary, prefix + "\U0010ffff")
+        return self.vocabulary[start:stop]
+
+    # Whether one of the task's tokens is the term or starts with it
+    def matches(self, task, term):
+        tokens = self.terms[task]
+        return term in tokens or any(token.startswith(term) for token in tokens)
+
+    # Relevance of a task for the query: whole-word hits count 2, prefix hits less the longer the completion
+    def score(self, task, terms):
+        tokens = self.terms[task]
+        total = 0.0
+        for term in terms:
+            if term in tokens:
+                total += 2.0
+            else:
+                total += max(len(term) / len(token) for token in tokens if token.startswith(term))
+        return total
+
+    # Tasks matching every query term (as a word or word prefix), best matches first
+    def search(self, query, limit=None):
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        expansions = []
+        for term in terms:
+            tokens = self.expand(term)
+            if not tokens:
+                return []
+            expansions.append((sum(len(self.postings[token]) for token in tokens), term, tokens))
+
+        # Only the rarest term's postings are materialized; the other terms filter that small set
+        expansions.sort()
+        if limit is not None:
+            return self.first_page(terms, expansions, limit)
+        _, _, tokens = expansions[0]
+        found = self.filter(set().union(*(self.postings[token] for token in tokens)), expansions[1:])
+
+        def rank(task):
+            return (-self.score(task, terms), task.id)
+
+        return sorted(found, key=rank)
+
+    # Keep the tasks that also match every other term
+    def filter(self, found, expansions):
+        for _, term, tokens in expansions:
+            if not found:
+                break
+            if len(tokens) == 1:
+                found &= self.postings[tokens[0]]
+            else:
+                found = {task for task in found if self.matches(task, term)}
+        return found
+
+    # The best limit matches without scoring every one of them. The rarest term's
+    # tokens are taken shortest first, since a shorter completion scores higher,
+    # and the walk stops once no task still to come can beat the page found so far.
+    def first_page(self, terms, expansions, limit):
+        _, term, tokens = expansions[0]
+        others = expansions[1:]
+        page = []  # heap of (score, -id, task), worst match first
+        seen = set()
+        for length, group in groupby(sorted(tokens, key=len), key=len):
+            term_score = 2.0 if length == len(term) else len(term) / length
+            if len(page) == limit and term_score + 2.0 * len(others) < page[0][0]:
+                break
+            matched = set().union(*(self.postings[token] for token in group)) - seen
+            seen |= matched
+            if others:
+                found = self.filter(matched, others)
+                scored = [(self.score(task, terms), -task.id, task) for task in found]
+            else:
+                # A single term scores the same for every task matched by this group
+                found = heapq.nsmallest(limit, matched, key=lambda task: task.id)
+                scored = [(term_score, -task.id, task) for task in found]
+            for entry in heapq.nlargest(limit, scored):
+                if len(page) < limit:
+                    heapq.heappush(page, entry)
+                elif entry > page[0]:
+                    heapq.heapreplace(page, entry)
+        return [task for _, _, task in sorted(page, reverse=True)]
+
+# Search index over the loaded tasks, kept in sync by record_change and journal replay
+search_index = SearchIndex()
+
+# Read a file in chunks, feeding every chunk to an optional digest (e.g. the snapshot fingerprint)
+def read_chunks(file, digest=None):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), b""):
+        if digest is not None:
+            digest.update(chunk)
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+# Yield the objects of a JSON array one at a time without parsing the whole file
+def iter_json_array(text, chunks):
+    decode = json.JSONDecoder().raw_decode
+    position = text.index("[") + 1
+    while True:
+        # Skip whitespace and the commas between elements
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        if position < len(text) and text[position] == "]":
+            return
+        try:
+            if position == len(text):
+                raise ValueError("need more data")
+            item, position = decode(text, position)
+        except ValueError:
+            more = next(chunks, None)
+            if more is None:
+                raise ValueError("Unexpected end of JSON task file.")
+            text = text[position:] + more
+            position = 0
+            continue
+        yield item
+
+# Yield the objects of a JSON-lines text one line at a time
+def iter_json_lines(text, chunks):
+    pending = text
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if pending.strip():
+        yield json.loads(pending)
+
+# Stream task dicts from a JSON array or JSON-lines file (the format is detected from the content)
+def iter_task_records(path, digest=None):
+    with open(path, "rb") as file:
+        chunks = read_chunks(file, digest)
+        text = ""
+        for chunk in chunks:
+            text += chunk
+            if text.strip():
+                break
+        if text.lstrip().startswith("["):
+            yield from iter_json_array(text, chunks)
+        else:
+            yield from iter_json_lines(text, chunks)
+        # Read what is left (e.g. trailing whitespace) so the digest covers the whole file
+        for _ in chunks:
+            pass
+
+# Stream task dicts from a CSV file written by export_to_csv
+def iter_csv_records(path):
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            record = {
+                "description": row["Description"],
+                "due_date": row.get("Due Date") or None,
+                "priority": row.get("Priority") or "Medium",
+                "completed": row.get("Completed", "").strip().lower() in ("true", "1", "yes"),
+            }
+            if row.get("ID"):
+                record["id"] = int(row["ID"])
+            yield record
+
+# Stream task dicts from any supported file, choosing the reader by extension
+def iter_records(path):
+    if path.lower().endswith(".csv"):
+        return iter_csv_records(path)
+    return iter_task_records(path)
+
+# Print one progress line on stderr
+def report_progress(count, started):
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"{count} tasks processed ({rate:,.0f} tasks/s)", file=sys.stderr)
+
+# Write task dicts one at a time as CSV, JSON lines or an indented JSON array.
+# Returns the number of tasks written; the digest, if given, receives every byte written.
+def write_task_records(records, file, file_format, digest=None, progress=False):
+    started = time.perf_counter()
+    count = 0
+
+    def emit(text):
+        data = text.encode("utf-8")
+        if digest is not None:
+            digest.update(data)
+        file.write(data)
+
+    if file_format == "csv":
+        writer = csv.writer(codecs.getwriter("utf-8")(file))
+        writer.writerow(["Description", "Due Date", "Priority", "Completed"])
+    elif file_format == "json":
+        emit("[")
+
+    for record in records:
+        if file_format == "csv":
+            writer.writerow([record["description"], record.get("due_date"), record.get("priority", "Medium"),
+                             record.get("completed", False)])
+        elif file_format == "json":
+            # Same layout as json.dump(tasks, indent=4), produced one task at a time
+            item = json.dumps(record, indent=4).replace("\n", "\n    ")
+            emit(("\n    " if count == 0 else ",\n    ") + item)
+        else:
+            emit(json.dumps(record) + "\n")
+        count += 1
+        if progress and count % PROGRESS_EVERY == 0:
+            report_progress(count, started)
+
+    if file_format == "json":
+        emit("\n]" if count else "]")
+    if progress:
+        report_progress(count, started)
+    return count
+
+# File format for a path: "csv", "jsonl" or "json"
+def file_format_for(path):
+    extension = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl"}.get(extension, "json")
+
+# Convert between tasks.json, JSON-lines and CSV files with constant memory
+def convert_tasks(source, destination):
+    with open(destination, "wb") as file:
+        return write_task_records(iter_records(source), file, file_format_for(destination), progress=True)
+
+# Find the task a journaled change refers to (older journals used list positions)
+def change_target(tasks, change):
+    if "id" in change:
+        return tasks.get(change["id"])
+    return tasks.nth(change["index"])
+
+# Apply one journaled change to the task list and a search index (the shared one by default)
+def apply_change(tasks, change, index=None):
+    index = search_index if index is None else index
+    if change["op"] == "add":
+        task = Task.from_dict(change["task"])
+        tasks.append(task)
+        index.add(task)
+    elif change["op"] == "update":
+        task = change_target(tasks, change)
+        task.update(change["fields"])
+        if "description" in change["fields"]:
+            index.update(task)
+    elif change["op"] == "delete":
+        index.remove(tasks.remove(change_target(tasks, change).id))
+
+# Read the journal header: the snapshot digest it is based on and the next task ID
+# to hand out (journals written before the ID was stored give 1)
+def read_journal_header(file):
+    try:
+        header = json.loads(file.readline())
+        return header["snapshot"], int(header.get("next_id", 1))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None, 1
+
+# Replay the journal on top of the snapshot, dropping a torn last line left by a crash
+def replay_journal(tasks, digest):
+    entries = 0
+    if not os.path.exists(JOURNAL_FILENAME):
+        return entries
+
+    with open(JOURNAL_FILENAME, "rb+") as file:
+        based_on, next_id = read_journal_header(file)
+        tasks.next_id = max(tasks.next_id, next_id)
+
+        # A different digest means the snapshot was rewritten after this journal
+        # (e.g. a crash during compaction), so its changes are already included
+        if based_on != digest:
+            file.seek(0)
+            file.truncate()
+            file.write((json.dumps({"snapshot": digest, "next_id": tasks.next_id}) + "\n").encode("utf-8"))
+            return entries
+
+        good_end = file.tell()
+        for line in iter(file.readline, b""):
+            try:
+                change = json.loads(line)
+            except ValueError:
+                file.truncate(good_end)
+                break
+            apply_change(tasks, change)
+            entries += 1
+            good_end = file.tell()
+    return entries
+
+# Load tasks from the snapshot file plus the journal
+def load_json_tasks():
+    tasks = TaskList()
+    # Files written before task IDs existed get their IDs assigned once and saved right away
+    upgraded = False
+
+    hasher = hashlib.sha1()
     if os.path.exists(FILENAME):
-        with open(FILENAME, "r") as file:
-            return json.load(file)
-    return []
+        for item in iter_task_records(FILENAME, hasher):
+            upgraded = upgraded or "id" not in item
+            tasks.append(Task.from_dict(item))
+
+    digest = hasher.hexdigest()
+    search_index.rebuild(tasks)
+    journal_state["snapshot"] = digest
+    journal_state["entries"] = replay_journal(tasks, digest)
+
+    if upgraded:
+        save_tasks(tasks)
+    return tasks
+
+# Stop with a message when FILENAME is a CSV file: CSV keeps no task IDs, so it
+# is only for import, export and convert
+def check_snapshot_format():
+    if file_format_for(FILENAME) == "csv":
+        sys.exit(f"TODO_FILE must be a .json or .jsonl file, not {FILENAME}. "
+                 "Use the import and export commands for CSV files.")
+
+# Load tasks from the selected storage engine
+@timed("todo.load_tasks")
+def load_tasks():
+    global due_index
+    check_snapshot_format()
+    if STORAGE == "sqlite":
+        tasks = TaskList(query_tasks())
+        tasks.next_id = max(tasks.next_id, db_next_id())
+        search_index.rebuild(tasks)
+    else:
+        tasks = load_json_tasks()
+    due_index = DueDateIndex(tasks)
+    return tasks
+
+# Start a fresh journal based on the given snapshot digest, recording the ID high-water mark
+def reset_journal(digest, next_id):
+    with open(JOURNAL_FILENAME, "w") as file:
+        file.write(json.dumps({"snapshot": digest, "next_id": next_id}) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+    journal_state["snapshot"] = digest
+    journal_state["entries"] = 0
 
-# Save tasks to file
+# Save tasks to file (compaction): write a new snapshot atomically, then reset the journal
+@timed("todo.save_tasks")
 def save_tasks(tasks):
-    with open(FILENAME, "w") as file:
-        json.dump(tasks, file, indent=4)
+    hasher = hashlib.sha1()
+    temp_filename = FILENAME + ".tmp"
+    with open(temp_filename, "wb") as file:
+        records = (task.to_dict() for task in tasks)
+        write_task_records(records, file, file_format_for(FILENAME), hasher)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, FILENAME)
+    digest = hasher.hexdigest()
+    reset_journal(digest, tasks.next_id)
+
+# Record a single change in O(1) by appending it to the journal
+@timed("todo.log_change")
+def log_change(tasks, change):
+    if not os.path.exists(JOURNAL_FILENAME):
+        reset_journal(journal_state["snapshot"], tasks.next_id)
+
+    with open(JOURNAL_FILENAME, "a") as file:
+        file.write(json.dumps(change) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+    journal_state["entries"] += 1
+
+    if journal_state["entries"] >= COMPACT_EVERY:
+        save_tasks(tasks)
+
+# Open the SQLite database, creating the schema and migrating tasks.json once
+def get_db():
+    if db_state["con"] is not None:
+        return db_state["con"]
+
+    con = sqlite3.connect(DB_FILENAME)
+    con.row_factory = sqlite3.Row
+    con.execute(TASKS_TABLE)
+    # Databases created before due_day existed get the column filled in once
+    if "due_day" not in {row["name"] for row in con.execute("PRAGMA table_info(tasks)")}:
+        with con:
+            con.execute("ALTER TABLE tasks ADD COLUMN due_day TEXT")
+            rows = con.execute("SELECT id, due_date FROM tasks WHERE due_date IS NOT NULL").fetchall()
+            con.executemany("UPDATE tasks SET due_day = ? WHERE id = ?",
+                            ((due_day(row["due_date"]), row["id"]) for row in rows))
+            con.execute("DROP INDEX IF EXISTS idx_tasks_due_date")
+    # Tables created without AUTOINCREMENT could reuse the ID of the newest task after
+    # it was deleted; they are rebuilt once (their indexes are recreated below)
+    schema = con.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'").fetchone()[0]
+    if "AUTOINCREMENT" not in schema.upper():
+        with con:
+            con.execute("ALTER TABLE tasks RENAME TO tasks_old")
+            con.execute(TASKS_TABLE)
+            con.execute(f"INSERT INTO tasks ({TASK_COLUMNS}) SELECT {TASK_COLUMNS} FROM tasks_old")
+            con.execute("DROP TABLE tasks_old")
+    con.executescript("""
+    CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed, id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_due_day ON tasks (due_day);
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+    """)
+    db_state["con"] = con
+
+    # user_version 0 means tasks.json has never been imported into this database
+    if con.execute("PRAGMA user_version").fetchone()[0] == 0:
+        migrate_json_to_sqlite(con)
+    return con
+
+# Apply the journal to a separate task list, without repairing the file or
+# touching the shared search index
+def read_journal_into(tasks, digest):
+    if not os.path.exists(JOURNAL_FILENAME):
+        return
+    with open(JOURNAL_FILENAME, "rb") as file:
+        based_on, next_id = read_journal_header(file)
+        tasks.next_id = max(tasks.next_id, next_id)
+        if based_on != digest:
+            return
+        index = SearchIndex()
+        for line in file:
+            try:
+                change = json.loads(line)
+            except ValueError:
+                return  # A torn last line left by a crash
+            apply_change(tasks, change, index)
+
+# One-shot import of tasks.json (snapshot + journal) into the SQLite database.
+# The files are only read: the JSON store and its in-memory state stay as they are.
+def migrate_json_to_sqlite(con):
+    tasks = TaskList()
+    hasher = hashlib.sha1()
+    if os.path.exists(FILENAME):
+        for item in iter_task_records(FILENAME, hasher):
+            tasks.append(Task.from_dict(item))
+    read_journal_into(tasks, hasher.hexdigest())
+    with con:
+        con.executemany(
+            "INSERT INTO tasks (id, description, due_date, due_day, priority, completed) VALUES (?, ?, ?, ?, ?, ?)",
+            ((task.id, task.description, task.due_date, due_day(task.due_date), task.priority, int(task.completed))
+             for task in tasks),
+        )
+        # Keep the JSON store's high-water mark, so the IDs of tasks deleted there stay unused
+        con.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+        con.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (tasks.next_id - 1,))
+        con.execute("PRAGMA user_version = 1")
+    if tasks:
+        # On stderr, so the output of the command that triggered it stays parseable
+        print(color(f"Migrated {len(tasks)} tasks from {FILENAME} to {DB_FILENAME}.", 92), file=sys.stderr)
+
+# The next task ID the database will hand out, from AUTOINCREMENT's high-water mark
+def db_next_id():
+    row = get_db().execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+    return row[0] + 1 if row else 1
+
+# Convert a database row into a Task
+def row_to_task(row):
+    return Task(row["description"], row["due_date"], row["priority"], bool(row["completed"]), row["id"])
+
+# Filtered, paged task query; every filter is served by an index
+def query_tasks(filter_type=None, limit=None, offset=0, sort=None):
+    where, params = "", []
+    if filter_type == "completed":
+        where = "WHERE completed = 1"
+    elif filter_type == "pending":
+        where = "WHERE completed = 0"
+    elif filter_type == "due_soon":
+        # due_day holds ISO dates (NULL when malformed), which sort as text, so its
+        # index answers the range directly and agrees with the in-memory due-date index
+        where = "WHERE due_day IS NOT NULL AND due_day <= ?"
+        params.append((datetime.today().date() + timedelta(days=3)).isoformat())
+    elif filter_type == "overdue":
+        where = "WHERE due_day IS NOT NULL AND due_day < ?"
+        params.append(datetime.today().date().isoformat())
+
+    # Date filters list the earliest due tasks first, like the in-memory due-date index
+    order = "due_day, id" if filter_type in ("due_soon", "overdue") else "id"
+    if sort:
+        order = SQL_ORDERS[sort]
+    query = f"SELECT * FROM tasks {where} ORDER BY {order} LIMIT ? OFFSET ?"
+    params += [-1 if limit is None else limit, offset]
+    return [row_to_task(row) for row in get_db().execute(query, params)]
+
+# Write one change to the database; tasks without an ID receive the new row id on insert
+def apply_db_change(change, task):
+    con = get_db()
+    if change["op"] == "add":
+        cursor = con.execute(
+            "INSERT INTO tasks (id, description, due_date, due_day, priority, completed) VALUES (?, ?, ?, ?, ?, ?)",
+            (task.id, task.description, task.due_date, due_day(task.due_date), task.priority, int(task.completed)),
+        )
+        task.id = cursor.lastrowid
+    elif change["op"] == "update":
+        fields = dict(change["fields"])
+        if "due_date" in fields:
+            fields["due_day"] = due_day(fields["due_date"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        con.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", (*fields.values(), task.id))
+    elif change["op"] == "delete":
+        con.execute("DELETE FROM tasks WHERE id = ?", (task.id,))
+    if not batch_state["active"]:
+        con.commit()
+
+# Persist a change with the selected storage engine and keep the in-memory indexes in sync
+def record_change(tasks, change, task):
+    if change["op"] == "add":
+        due_index.add(task)
+        search_index.add(task)
+    elif change["op"] == "delete":
+        due_index.remove(task)
+        search_index.remove(task)
+    else:
+        if "due_date" in change["fields"]:
+            due_index.update(task)
+        if "description" in change["fields"]:
+            search_index.update(task)
+
+    if STORAGE == "sqlite":
+        apply_db_change(change, task)
+    elif not batch_state["active"]:
+        log_change(tasks, change)
+
+# Iterate over every stored task without building a second list
+def iter_stored_tasks(tasks):
+    if STORAGE == "sqlite":
+        for row in get_db().execute("SELECT * FROM tasks ORDER BY id"):
+            yield row_to_task(row)
+    else:
+        yield from tasks
 
 # Add a new task
 def add_task(tasks):
@@ -24,131 +769,361 @@ def add_task(tasks):
     due_date = input("Enter due date (YYYY-MM-DD) or leave blank: ").strip()
     priority = input("Set priority (Low, Medium, High): ").strip().capitalize()
 
+    create_task(tasks, description, due_date, priority)
+    print(color("Task added successfully!", 92))  # Green text
+
+# Create and store a task; shared by the menu and the command line
+def create_task(tasks, description, due_date=None, priority="Medium", completed=False):
     if priority not in PRIORITY_LEVELS:
         priority = "Medium"  # Default priority
 
-    task = {
-        "description": description,
-        "due_date": due_date if due_date else None,
-        "priority": priority,
-        "completed": False,
-    }
+    task = Task(description, due_date if due_date else None, priority, completed)
     tasks.append(task)
-    save_tasks(tasks)
-    print("\033[92mTask added successfully!\033[0m")  # Green text
+    record_change(tasks, {"op": "add", "task": task.to_dict()}, task)
+    return task
 
-# View tasks with optional filtering
-def view_tasks(tasks, filter_type=None):
-    today = datetime.today().date()
-    print("\n\033[94m--- To-Do List ---\033[0m")  # Blue text
+# Change some fields of a task and store the change
+def change_task(tasks, task, fields):
+    if not fields:
+        return
+    task.update(fields)
+    record_change(tasks, {"op": "update", "id": task.id, "fields": fields}, task)
 
-    filtered_tasks = []
-    for task in tasks:
-        due_date = task["due_date"]
-        priority = task.get("priority", "Medium")
-        completed = task["completed"]
+# Delete a task and store the change
+def remove_task(tasks, task):
+    tasks.remove(task.id)
+    record_change(tasks, {"op": "delete", "id": task.id}, task)
 
-        if filter_type == "completed" and not completed:
-            continue
-        elif filter_type == "pending" and completed:
-            continue
-        elif filter_type == "due_soon" and (not due_date or datetime.strptime(due_date, "%Y-%m-%d").date() > today + timedelta(days=3)):
-            continue
+# Select the tasks matching a filter from the in-memory list
+def filter_tasks(tasks, filter_type, today):
+    if filter_type == "completed":
+        return (task for task in tasks if task.completed)
+    elif filter_type == "pending":
+        return (task for task in tasks if not task.completed)
+    elif filter_type == "due_soon":
+        return due_index.due_until(today + timedelta(days=3))
+    elif filter_type == "overdue":
+        return due_index.due_before(today)
+    return tasks
 
-        # Mark overdue tasks
-        if due_date:
-            task_date = datetime.strptime(due_date, "%Y-%m-%d").date()
-            due_status = f"(Due: {due_date})"
-            if task_date < today:
-                due_status += " [Overdue]"
+# Sort key for each order: earliest due first (undated last), or highest priority first
+def due_order(task):
+    return (task.due is None, task.due or datetime.min.date(), task.id)
+
+def priority_order(task):
+    return (PRIORITY_RANK.get(task.priority, len(PRIORITY_RANK)),) + due_order(task)
+
+SORT_KEYS = {"due": due_order, "priority": priority_order}
+
+# Sort tasks and take one page; a limited page only keeps the tasks it needs in a heap
+def sort_tasks(found_tasks, sort, limit=None, offset=0):
+    key = SORT_KEYS[sort]
+    if limit is None:
+        return sorted(found_tasks, key=key)[offset:]
+    return heapq.nsmallest(offset + limit, found_tasks, key=key)[offset:]
+
+# Select one page of the tasks matching a filter from the active storage engine
+def select_tasks(tasks, filter_type=None, limit=None, offset=0, sort=None):
+    if STORAGE == "sqlite":
+        return query_tasks(filter_type, limit, offset, sort)
+    found_tasks = filter_tasks(tasks, filter_type, datetime.today().date())
+    if sort:
+        return sort_tasks(found_tasks, sort, limit, offset)
+    stop = None if limit is None else offset + limit
+    return islice(found_tasks, offset, stop)
+
+# Format one listing row, marking overdue tasks
+def format_task(task, today):
+    if task.due_date:
+        due_status = f"(Due: {task.due_date})"
+        if task.due and task.due < today:
+            due_status += " " + color("[Overdue]", 91)
+    else:
+        due_status = ""
+
+    status = color("[✔]", 92) if task.completed else "[✘]"
+    return f"{task.id}. {status} {task.description} {due_status} (Priority: {task.priority})\n"
+
+# Write tasks as JSON lines or as the usual listing, RENDER_BATCH rows per write
+def print_tasks(found_tasks, as_json=False):
+    today = datetime.today().date()
+    found_tasks = iter(found_tasks)
+    while True:
+        batch = list(islice(found_tasks, RENDER_BATCH))
+        if not batch:
+            break
+        if as_json:
+            sys.stdout.write("".join(json.dumps(task.to_dict()) + "\n" for task in batch))
         else:
-            due_status = ""
+            sys.stdout.write("".join(format_task(task, today) for task in batch))
+    sys.stdout.flush()
 
-        status = "[✔]" if completed else "[✘]"
-        print(f"{status} {task['description']} {due_status} (Priority: {priority})")
-        filtered_tasks.append(task)
+# Rows of tasks that fit on one pager page
+def page_size():
+    return max(shutil.get_terminal_size().lines - 3, 5)
 
-    if not filtered_tasks:
-        print("\033[91mNo tasks found.\033[0m")  # Red text
+# Page through tasks in the terminal, formatting only the rows on screen.
+# Enter or n shows the next page, p the previous one, s changes the sort order and q stops.
+def page_tasks(found_tasks, title):
+    today = datetime.today().date()
+    listed = found_tasks
+    sort = None
+    page = 0
+    while True:
+        size = page_size()
+        pages = -(-len(listed) // size)
+        page = max(min(page, pages - 1), 0)
+        rows = "".join(format_task(task, today) for task in listed[page * size:(page + 1) * size])
+        sys.stdout.write("\n" + color(title, 94) + "\n" + rows)
+        sys.stdout.flush()
+        key = input(f"-- Page {page + 1}/{pages}, {sort or 'listed'} order: "
+                    "Enter/n next, p previous, s sort, q quit -- ").strip().lower()
+        if key in ("", "n"):
+            if page + 1 >= pages:
+                break
+            page += 1
+        elif key == "p":
+            page -= 1
+        elif key == "s":
+            sort = SORT_ORDERS[(SORT_ORDERS.index(sort) + 1) % len(SORT_ORDERS)]
+            listed = sort_tasks(found_tasks, sort) if sort else found_tasks
+            page = 0
+        elif key == "q":
+            break
+
+# Show a listing under a title: through the pager when it does not fit the terminal,
+# otherwise in one write
+def show_tasks(found_tasks, title, empty_message):
+    if not found_tasks:
+        sys.stdout.write("\n" + color(title, 94) + "\n" + color(empty_message, 91) + "\n")  # Blue, then red text
+    elif sys.stdin.isatty() and sys.stdout.isatty() and len(found_tasks) > page_size():
+        page_tasks(found_tasks, title)
+    else:
+        sys.stdout.write("\n" + color(title, 94) + "\n")
+        print_tasks(found_tasks)
+
+# View tasks with optional filtering, sorting and paging
+@timed("todo.view_tasks")
+def view_tasks(tasks, filter_type=None, limit=None, offset=0, sort=None):
+    show_tasks(list(select_tasks(tasks, filter_type, limit, offset, sort)), "--- To-Do List ---", "No tasks found.")
+
+# Ask for a task ID and return the matching task, or None if there is no such task
+def ask_task(tasks, prompt):
+    try:
+        task = tasks.get(int(input(prompt)))
+    except ValueError:
+        print(color("Invalid input. Enter a number.", 91))
+        return None
+    if task is None:
+        print(color("Invalid task ID.", 91))
+    return task
 
 # Mark a task as completed
 def mark_completed(tasks):
     view_tasks(tasks, "pending")
-    try:
-        index = int(input("Enter task number to mark as completed: ")) - 1
-        if 0 <= index < len(tasks):
-            tasks[index]["completed"] = True
-            save_tasks(tasks)
-            print("\033[92mTask marked as completed!\033[0m")
-        else:
-            print("\033[91mInvalid task number.\033[0m")
-    except ValueError:
-        print("\033[91mInvalid input. Enter a number.\033[0m")
+    task = ask_task(tasks, "Enter task ID to mark as completed: ")
+    if task:
+        change_task(tasks, task, {"completed": True})
+        print(color("Task marked as completed!", 92))
 
 # Edit a task
 def edit_task(tasks):
     view_tasks(tasks)
-    try:
-        index = int(input("Enter task number to edit: ")) - 1
-        if 0 <= index < len(tasks):
-            tasks[index]["description"] = input("Enter new description: ").strip()
-            due_date = input("Enter new due date (YYYY-MM-DD) or leave blank: ").strip()
-            if due_date:
-                tasks[index]["due_date"] = due_date
-            priority = input("Set new priority (Low, Medium, High): ").strip().capitalize()
-            if priority in PRIORITY_LEVELS:
-                tasks[index]["priority"] = priority
-            save_tasks(tasks)
-            print("\033[92mTask updated successfully!\033[0m")
-        else:
-            print("\033[91mInvalid task number.\033[0m")
-    except ValueError:
-        print("\033[91mInvalid input. Enter a number.\033[0m")
+    task = ask_task(tasks, "Enter task ID to edit: ")
+    if task:
+        fields = {"description": input("Enter new description: ").strip()}
+        due_date = input("Enter new due date (YYYY-MM-DD) or leave blank: ").strip()
+        if due_date:
+            fields["due_date"] = due_date
+        priority = input("Set new priority (Low, Medium, High): ").strip().capitalize()
+        if priority in PRIORITY_LEVELS:
+            fields["priority"] = priority
+        change_task(tasks, task, fields)
+        print(color("Task updated successfully!", 92))
 
 # Delete a task
 def delete_task(tasks):
     view_tasks(tasks)
-    try:
-        index = int(input("Enter task number to delete: ")) - 1
-        if 0 <= index < len(tasks):
-            del tasks[index]
-            save_tasks(tasks)
-            print("\033[92mTask deleted successfully!\033[0m")
-        else:
-            print("\033[91mInvalid task number.\033[0m")
-    except ValueError:
-        print("\033[91mInvalid input. Enter a number.\033[0m")
+    task = ask_task(tasks, "Enter task ID to delete: ")
+    if task:
+        remove_task(tasks, task)
+        print(color("Task deleted successfully!", 92))
 
 # Search tasks
 def search_task(tasks):
-    keyword = input("Enter keyword to search: ").strip().lower()
-    print("\n\033[94m--- Search Results ---\033[0m")
-    found_tasks = [task for task in tasks if keyword in task["description"].lower()]
-    
-    if found_tasks:
-        for task in found_tasks:
-            due_status = f"(Due: {task['due_date']})" if task["due_date"] else ""
-            status = "[✔]" if task["completed"] else "[✘]"
-            print(f"{status} {task['description']} {due_status} (Priority: {task.get('priority', 'Medium')})")
+    keyword = input("Enter keywords to search: ").strip()
+    show_tasks(search_index.search(keyword), "--- Search Results ---", "No tasks found matching your search.")
+
+# Export tasks to CSV (or JSON lines for a .jsonl file name), one task at a time
+def export_to_csv(tasks, filename="tasks_backup.csv", progress=False):
+    with open(filename, "wb") as file:
+        records = (task.to_dict() for task in iter_stored_tasks(tasks))
+        write_task_records(records, file, file_format_for(filename), progress=progress)
+    print(color(f"Tasks exported to {filename} successfully!", 92))
+
+# Import tasks from a CSV, JSON-lines or tasks.json file, saving once at the end
+def import_tasks(tasks, path):
+    started = time.perf_counter()
+    count = 0
+    batch_state["active"] = True
+    try:
+        for record in iter_records(path):
+            create_task(tasks, record["description"], record.get("due_date"),
+                        record.get("priority", "Medium"), record.get("completed", False))
+            count += 1
+            if count % PROGRESS_EVERY == 0:
+                report_progress(count, started)
+    finally:
+        finish_batch(tasks)
+    report_progress(count, started)
+    return count
+
+# Command-line interface: one subcommand per menu action
+def build_parser():
+    parser = argparse.ArgumentParser(description="Command-line To-Do List Manager.")
+    parser.add_argument("--storage", choices=["json", "sqlite"], help="Storage engine (default: $TODO_STORAGE or json).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Add a task.")
+    add.add_argument("description")
+    add.add_argument("--due", help="Due date (YYYY-MM-DD).")
+    add.add_argument("--priority", default="Medium", type=str.capitalize, choices=PRIORITY_LEVELS)
+
+    complete = commands.add_parser("complete", help="Mark a task as completed.")
+    complete.add_argument("id", type=int)
+
+    edit = commands.add_parser("edit", help="Edit a task.")
+    edit.add_argument("id", type=int)
+    edit.add_argument("--description")
+    edit.add_argument("--due", help="Due date (YYYY-MM-DD).")
+    edit.add_argument("--priority", type=str.capitalize, choices=PRIORITY_LEVELS)
+
+    delete = commands.add_parser("delete", help="Delete a task.")
+    delete.add_argument("id", type=int)
+
+    listing = commands.add_parser("list", help="List tasks.")
+    listing.add_argument("--filter", choices=["all", "completed", "pending", "due_soon", "overdue"], default="all")
+    listing.add_argument("--limit", type=int)
+    listing.add_argument("--offset", type=int, default=0)
+    listing.add_argument("--sort", choices=SORT_ORDERS[1:], help="Sort by due date or priority.")
+    listing.add_argument("--json", action="store_true", help="Print one JSON object per task.")
+
+    search = commands.add_parser("search", help="Search task descriptions.")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int)
+    search.add_argument("--sort", choices=SORT_ORDERS[1:], help="Sort matches by due date or priority instead of relevance.")
+    search.add_argument("--json", action="store_true", help="Print one JSON object per task.")
+
+    export = commands.add_parser("export", help="Export tasks to CSV or JSON lines (.jsonl).")
+    export.add_argument("--output", default="tasks_backup.csv")
+
+    importing = commands.add_parser("import", help="Import tasks from a CSV, JSON-lines or tasks.json file.")
+    importing.add_argument("file")
+
+    convert = commands.add_parser("convert", help="Convert a task file between JSON, JSON lines and CSV.")
+    convert.add_argument("source")
+    convert.add_argument("destination")
+
+    batch = commands.add_parser("batch", help="Run one command per line from a file or stdin, saving once at the end.")
+    batch.add_argument("file", nargs="?", default="-")
+    return parser
+
+# Run one parsed command; returns False when it refers to a missing task
+def run_command(tasks, args):
+    if args.command == "add":
+        task = create_task(tasks, args.description, args.due, args.priority)
+        print(task.id)
+    elif args.command in ("complete", "edit", "delete"):
+        task = tasks.get(args.id)
+        if task is None:
+            print(f"No task with ID {args.id}.", file=sys.stderr)
+            return False
+        if args.command == "complete":
+            change_task(tasks, task, {"completed": True})
+        elif args.command == "delete":
+            remove_task(tasks, task)
+        else:
+            fields = {}
+            if args.description is not None:
+                fields["description"] = args.description
+            if args.due is not None:
+                fields["due_date"] = args.due
+            if args.priority is not None:
+                fields["priority"] = args.priority
+            change_task(tasks, task, fields)
+    elif args.command == "list":
+        filter_type = None if args.filter == "all" else args.filter
+        print_tasks(select_tasks(tasks, filter_type, args.limit, args.offset, args.sort), args.json)
+    elif args.command == "search":
+        if args.sort:
+            print_tasks(sort_tasks(search_index.search(args.query), args.sort, args.limit), args.json)
+        else:
+            print_tasks(search_index.search(args.query, args.limit), args.json)
+    elif args.command == "export":
+        export_to_csv(tasks, args.output, progress=True)
+    elif args.command == "import":
+        import_tasks(tasks, args.file)
+    return True
+
+# Apply many commands in one process; everything is persisted once at the end
+def run_batch(tasks, parser, file):
+    source = sys.stdin if file == "-" else open(file)
+    failures = 0
+    batch_state["active"] = True
+    try:
+        for number, line in enumerate(source, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                args = parser.parse_args(shlex.split(line))
+            except (SystemExit, ValueError):
+                print(f"Line {number}: invalid command: {line}", file=sys.stderr)
+                failures += 1
+                continue
+            if args.command in ("batch", "import", "convert"):
+                print(f"Line {number}: {args.command} is not allowed in batch mode", file=sys.stderr)
+                failures += 1
+            elif not run_command(tasks, args):
+                failures += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        finish_batch(tasks)
+    return failures
+
+# End batch mode and persist everything changed during it
+def finish_batch(tasks):
+    batch_state["active"] = False
+    if STORAGE == "sqlite":
+        get_db().commit()
     else:
-        print("\033[91mNo tasks found matching your search.\033[0m")
+        save_tasks(tasks)
 
-# Export tasks to CSV
-def export_to_csv(tasks):
-    filename = "tasks_backup.csv"
-    with open(filename, "w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["Description", "Due Date", "Priority", "Completed"])
-        for task in tasks:
-            writer.writerow([task["description"], task["due_date"], task["priority"], task["completed"]])
-    print(f"\033[92mTasks exported to {filename} successfully!\033[0m")
+# Non-interactive entry point
+def cli_main(argv=None):
+    global STORAGE
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.storage:
+        STORAGE = args.storage
+
+    # Converting files never loads the task store
+    if args.command == "convert":
+        convert_tasks(args.source, args.destination)
+        return 0
+
+    tasks = load_tasks()
+    if args.command == "batch":
+        return 1 if run_batch(tasks, parser, args.file) else 0
+    return 0 if run_command(tasks, args) else 1
 
 # Main menu
 def main():
     tasks = load_tasks()
 
     while True:
-        print("\n\033[96m--- To-Do List Manager ---\033[0m")  # Cyan text
+        print("\n" + color("--- To-Do List Manager ---", 96))  # Cyan text
         print("1. Add Task")
         print("2. View All Tasks")
         print("3. View Completed Tasks")
@@ -160,6 +1135,7 @@ def main():
         print("9. Search Task")
         print("10. Export Tasks to CSV")
         print("11. Exit")
+        print("12. View Overdue Tasks")
         
         choice = input("Choose an option: ").strip()
 
@@ -184,10 +1160,18 @@ def main():
         elif choice == "10":
             export_to_csv(tasks)
         elif choice == "11":
-            print("\033[93mExiting... Have a productive day!\033[0m")
+            if journal_state["entries"]:
+                save_tasks(tasks)  # Compact the journal into the snapshot before leaving
+            print(color("Exiting... Have a productive day!", 93))
             break
+        elif choice == "12":
+            view_tasks(tasks, "overdue")
         else:
-            print("\033[91mInvalid choice. Please try again.\033[0m")
+            print(color("Invalid choice. Please try again.", 91))
 
 if __name__ == "__main__":
+    # Use the command line interface when arguments other than --profile are given, the menu otherwise
+    argv = instrumentation.configure()
+    if argv:
+        sys.exit(cli_main(argv))
     main()
@@ -0,0 +1,184 @@
+"""Time the contact book's database paths on synthetic contacts.
+
+    python benchmark.py                               # 10k and 100k contacts
+    python benchmark.py --sizes 1000000 10000000      # bigger tables (the 10M run takes a while)
+    python benchmark.py --json results.json           # save the numbers
+    python benchmark.py --baseline results.json       # exit 1 if anything got slower than the saved run
+
+Each size gets a fresh database in a temporary directory unless --keep-dir is given.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from contact_repository import PAGE_SIZE, ContactRepository  # noqa: E402
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Aarav", "Priya",
+               "Wei", "Mei", "Hiroshi", "Yuki", "Carlos", "Sofia", "Ahmed", "Fatima", "Olga", "Ivan"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Sharma", "Patel", "Wang", "Li", "Tanaka",
+              "Suzuki", "Kim", "Nguyen", "Silva", "Santos", "Khan", "Ali", "Ivanov", "Petrov", "Muller"]
+# Single-row operations timed per size (inserts, updates, deletes, searches, pages)
+OPERATIONS = 1000
+# Slowdown allowed against a baseline before a result counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+def mobile_number(index):
+    """A unique, scattered 10-digit number for each index below 10**9."""
+    return "9" + f"{index * 2654435761 % 10**9:09d}"
+
+def formatted(mobile):
+    """The same number written another way, with a country code and separators."""
+    return f"+91 {mobile[:5]}-{mobile[5:]}"
+
+def synthetic_contacts(count, start=0, seed=0):
+    """Yield count contact tuples (Name, Mobile_Number, Phone1, Phone2, Email, Notes).
+
+    About 1% list an earlier contact's mobile, formatted differently, as their second phone.
+    """
+    rng = random.Random(seed + start)
+    for index in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        phone1 = f"+1 555 {rng.randrange(10**7):07d}" if rng.random() < 0.5 else None
+        phone2 = f"+44 20 {rng.randrange(10**8):08d}" if rng.random() < 0.2 else None
+        if index and rng.random() < 0.01:
+            phone2 = formatted(mobile_number(rng.randrange(index)))
+        notes = f"met at conference {rng.randrange(100)}" if rng.random() < 0.1 else None
+        yield (f"{first} {last} {index}", mobile_number(index), phone1, phone2,
+               f"{first}.{last}{index}@example.com".lower(), notes)
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def measure(func, calls):
+    """Call func(argument) for each argument; return {ops_per_sec, p50_ms, p95_ms}."""
+    samples = []
+    for argument in calls:
+        start = time.perf_counter()
+        func(argument)
+        samples.append(time.perf_counter() - start)
+    return {
+        "ops_per_sec": len(samples) / max(sum(samples), 1e-9),
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+    }
+
+def run_size(size, directory, seed):
+    """Build a table of size synthetic contacts and time each path against it."""
+    path = os.path.join(directory, f"contacts_{size}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    repo = ContactRepository(path)
+    rng = random.Random(seed)
+    results = {}
+
+    read, _, _, seconds = repo.import_contacts(synthetic_contacts(size, seed=seed))
+    results["bulk_insert"] = {"ops_per_sec": read / max(seconds, 1e-9), "seconds": seconds}
+
+    # Single-row changes, each committed on its own like the window does
+    extra = list(synthetic_contacts(OPERATIONS, start=size, seed=seed))
+    results["insert"] = measure(lambda contact: repo.add(*contact), extra)
+    targets = [mobile_number(rng.randrange(size)) for _ in range(OPERATIONS)]
+    results["update"] = measure(lambda mobile: repo.update(mobile, {"Name": "Renamed " + mobile}), targets)
+
+    # Searches as typed into the window: a name fragment, a short prefix and part of an email.
+    # The cache is cleared first so every call reaches SQLite.
+    def first_page(search):
+        repo.search_cache.clear()
+        repo.page(search)
+    samples = OPERATIONS // 10
+    results["search_name"] = measure(first_page, [f"{rng.choice(LAST_NAMES)} {rng.randrange(size)}"
+                                                  for _ in range(samples)])
+    results["search_short"] = measure(first_page, [rng.choice(FIRST_NAMES)[:2] for _ in range(samples)])
+    results["search_email"] = measure(first_page, [f"{rng.randrange(size)}@exa" for _ in range(samples)])
+
+    # Scrolling: consecutive pages of the whole list from a random start, back to
+    # the first page after the last one (an empty mobile sorts before every saved one)
+    keys = [(rng.choice(FIRST_NAMES), "")]
+    def next_page(_):
+        page = repo.page("", keys[-1])
+        keys.append(page[-1] if len(page) == PAGE_SIZE else None)
+    results["scroll"] = measure(next_page, range(samples))
+
+    # Reverse lookups by a differently formatted number, and one full duplicate scan
+    results["lookup"] = measure(repo.lookup_phone, [formatted(mobile_number(rng.randrange(size)))
+                                                     for _ in range(OPERATIONS)])
+    start = time.perf_counter()
+    groups = sum(1 for _ in repo.find_duplicates())
+    seconds = time.perf_counter() - start
+    results["duplicates"] = {"ops_per_sec": repo.count() / max(seconds, 1e-9), "seconds": seconds, "groups": groups}
+
+    deleted = [contact[1] for contact in extra]
+    results["delete"] = measure(repo.delete, deleted)
+
+    repo.close()
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return messages for each timing that is slower than the baseline by more than the tolerance."""
+    regressions = []
+    for size, operations in results.items():
+        for name, numbers in operations.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            ratio = before["ops_per_sec"] / numbers["ops_per_sec"]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{size} contacts, {name}: {numbers['ops_per_sec']:,.0f} ops/s "
+                                   f"vs {before['ops_per_sec']:,.0f} in the baseline ({ratio:.2f}x slower)")
+    return regressions
+
+def print_results(size, operations):
+    print(f"\n{size:,} contacts")
+    print(f"  {'operation':<14}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, numbers in operations.items():
+        p50 = f"{numbers['p50_ms']:.3f}" if "p50_ms" in numbers else "-"
+        p95 = f"{numbers['p95_ms']:.3f}" if "p95_ms" in numbers else "-"
+        print(f"  {name:<14}{numbers['ops_per_sec']:>12,.0f}{p50:>10}{p95:>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the contact book's database paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                        help="numbers of synthetic contacts to test with")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-dir", help="build the databases here and keep them")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args(instrumentation.configure(argv))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.keep_dir or scratch
+        os.makedirs(directory, exist_ok=True)
+        for size in args.sizes:
+            results[str(size)] = run_size(size, directory, args.seed)
+            print_results(size, results[str(size)])
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for message in regressions:
+            print("REGRESSION:", message)
+        if regressions:
+            return 1
+        print("\nNo regressions against", args.baseline)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,579 @@
+"""Contact storage without a GUI: the CONTACTS_TABLE schema, its queries and bulk import/export.
+
+ContactApp drives it from a worker thread; scripts and benchmark.py can use it directly.
+"""
+import csv
+import re
+import sqlite3
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import groupby, islice
+from operator import itemgetter
+
+from instrumentation import count, timed
+
+DB_FILENAME = "contact_book.db"
+# Compiled statements kept per connection; every query shape below fits with room to spare
+STATEMENT_CACHE_SIZE = 256
+# Number of recent search results kept in memory
+SEARCH_CACHE_SIZE = 32
+# Larger result sets are not cached (they come from very short, unselective searches)
+SEARCH_CACHE_MAX_ROWS = 10000
+# Columns covered by the search
+SEARCH_COLUMNS = ("Name", "Mobile_Number", "Phone1", "Phone2", "Email", "Notes")
+# Rows fetched per page of the contact list
+PAGE_SIZE = 100
+# Rows per executemany call, and per transaction, in a bulk import
+IMPORT_BATCH_SIZE = 50000
+# What a bulk import does with a Mobile_Number that is already saved:
+# keep the saved contact, replace it, or fill in only the fields the file has values for
+CONFLICT_POLICIES = ("skip", "overwrite", "merge")
+VCARD_EXTENSIONS = (".vcf", ".vcard")
+# PRAGMA user_version of the current schema (1: derived lookup columns)
+SCHEMA_VERSION = 1
+# Columns the repository fills in from another column on every write, in with_derived() order:
+# an order-insensitive name key and the bare digits of each phone number
+DERIVED_COLUMNS = {"Name_Key": "Name", "Mobile_Digits": "Mobile_Number", "Phone1_Digits": "Phone1",
+                   "Phone2_Digits": "Phone2"}
+PHONE_DIGIT_COLUMNS = ("Mobile_Digits", "Phone1_Digits", "Phone2_Digits")
+# Phone numbers are indexed and blocked by their last digits; numbers shorter than this only match exactly
+PHONE_KEY_DIGITS = 7
+ALL_COLUMNS = SEARCH_COLUMNS + tuple(DERIVED_COLUMNS)
+
+def normalize_phone(number):
+    """Bare digits of a phone number without leading zeros ("+1 555-0100" -> "15550100")."""
+    if not number:
+        return None
+    # Leading zeros are the 00 international or 0 trunk prefix, so "020 7946 0000" ends like "+44 20 7946 0000"
+    return re.sub(r"[^0-9]", "", number).lstrip("0") or None
+
+def phones_match(a, b):
+    """Whether two normalized numbers are the same line: equal, or the shorter (of at least
+    PHONE_KEY_DIGITS digits) ends the longer, as when only one has the country code."""
+    if len(a) > len(b):
+        a, b = b, a
+    return a == b or (len(a) >= PHONE_KEY_DIGITS and b.endswith(a))
+
+def name_key(name):
+    """Case-, accent- and order-insensitive key for a name: "Smith, Zoë" and "zoe smith" both give "smith zoe"."""
+    if not name:
+        return None
+    text = "".join(char for char in unicodedata.normalize("NFKD", name) if not unicodedata.combining(char))
+    return " ".join(sorted(re.findall(r"\w+", text.casefold()))) or None
+
+def with_derived(record):
+    """Extend a contact tuple (SEARCH_COLUMNS order) with its DERIVED_COLUMNS values."""
+    name, mobile, phone1, phone2 = record[:4]
+    return tuple(record) + (name_key(name), normalize_phone(mobile), normalize_phone(phone1), normalize_phone(phone2))
+
+def phone_key(column):
+    """SQL for the indexed tail of a phone digits column."""
+    return f"substr({column}, -{PHONE_KEY_DIGITS})"
+
+def phone_groups(entries):
+    """Split one block of (digits, mobile) entries into sorted lists of 2+ contacts whose numbers match."""
+    numbers = sorted({digits for digits, _ in entries})
+    parent = {number: number for number in numbers}
+
+    def root(number):
+        while parent[number] != number:
+            number = parent[number]
+        return number
+
+    for index, a in enumerate(numbers):
+        for b in numbers[index + 1:]:
+            if phones_match(a, b):
+                parent[root(b)] = root(a)
+
+    groups = {}
+    for digits, mobile in entries:
+        groups.setdefault(root(digits), set()).add(mobile)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+@lru_cache(maxsize=None)
+def search_sql(mode, direction, keyed, limited):
+    """SELECT for one query shape.
+
+    mode is None (every contact), "fts" (trigram MATCH) or "like". The text is built once per
+    shape, so sqlite3 finds the compiled statement in its cache instead of preparing it again.
+    """
+    # The third column joins all searchable fields so cached results can be narrowed in Python
+    text = " || char(31) || ".join(f"coalesce(c.{column}, '')" for column in SEARCH_COLUMNS)
+    select = f"SELECT c.Name, c.Mobile_Number, lower({text}) FROM CONTACTS_TABLE c"
+    conditions = []
+
+    if mode == "fts":
+        select += " JOIN CONTACTS_FTS f ON f.rowid = c.rowid"
+        conditions.append("CONTACTS_FTS MATCH ?")
+    elif mode == "like":
+        conditions.append("(" + " OR ".join(f"c.{column} LIKE ?" for column in SEARCH_COLUMNS) + ")")
+
+    if keyed:
+        conditions.append(f"(c.Name, c.Mobile_Number) {direction} (?, ?)")
+    if conditions:
+        select += " WHERE " + " AND ".join(conditions)
+
+    # Pages before the key are read backwards from it and flipped afterwards
+    order = "DESC" if direction == "<" else "ASC"
+    select += f" ORDER BY c.Name {order}, c.Mobile_Number {order}"
+    if limited:
+        select += " LIMIT ?"
+    return select
+
+@lru_cache(maxsize=None)
+def update_sql(columns):
+    """UPDATE statement setting the given columns of one contact."""
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    return f"UPDATE CONTACTS_TABLE SET {assignments} WHERE Mobile_Number = ?"
+
+@lru_cache(maxsize=None)
+def upsert_sql(policy):
+    """INSERT statement for one contact (ALL_COLUMNS) that resolves a Mobile_Number conflict by the policy."""
+    columns = ", ".join(ALL_COLUMNS)
+    placeholders = ", ".join("?" for _ in ALL_COLUMNS)
+    sql = f"INSERT INTO CONTACTS_TABLE ({columns}) VALUES ({placeholders}) ON CONFLICT (Mobile_Number) DO "
+    others = [column for column in SEARCH_COLUMNS if column != "Mobile_Number"]
+    derived = [column for column in DERIVED_COLUMNS if column != "Mobile_Digits"]
+    if policy == "skip":
+        return sql + "NOTHING"
+    if policy == "overwrite":
+        assignments = [f"{column} = excluded.{column}" for column in others + derived]
+    elif policy == "merge":
+        assignments = [f"{column} = coalesce(nullif(excluded.{column}, ''), {column})" for column in others]
+        # A derived column follows its source: replaced only when the source was
+        assignments += [f"{column} = CASE WHEN nullif(excluded.{DERIVED_COLUMNS[column]}, '') IS NULL "
+                        f"THEN {column} ELSE excluded.{column} END" for column in derived]
+    else:
+        raise ValueError(f"Unknown conflict policy: {policy}")
+    return sql + "UPDATE SET " + ", ".join(assignments)
+
+def import_contacts(con, records, policy="skip"):
+    """Save contact tuples (in SEARCH_COLUMNS order) in batched transactions.
+
+    Returns (rows read, rows rejected for a missing name or mobile number, rows added or changed, seconds).
+    """
+    sql = upsert_sql(policy)
+    columns = ", ".join(SEARCH_COLUMNS)
+    # Indexing new rows for search one INSERT ... SELECT per batch is several times faster than
+    # letting the insert trigger do it row by row, so the trigger is lifted inside each transaction
+    trigger = con.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'CONTACTS_FTS_INSERT'").fetchone()
+    start = time.perf_counter()
+    read = rejected = changed = 0
+    records = iter(records)
+    while True:
+        batch = list(islice(records, IMPORT_BATCH_SIZE))
+        if not batch:
+            break
+        read += len(batch)
+        valid = [with_derived(record) for record in batch if record[0] and record[1]]
+        rejected += len(batch) - len(valid)
+        with con:
+            con.execute("BEGIN")
+            if trigger:
+                last_rowid = con.execute("SELECT coalesce(max(rowid), 0) FROM CONTACTS_TABLE").fetchone()[0]
+                con.execute("DROP TRIGGER CONTACTS_FTS_INSERT")
+            changed += con.executemany(sql, valid).rowcount
+            if trigger:
+                con.execute(f"INSERT INTO CONTACTS_FTS (rowid, {columns}) "
+                            f"SELECT rowid, {columns} FROM CONTACTS_TABLE WHERE rowid > ?", (last_rowid,))
+                con.execute(trigger[0])
+    return read, rejected, changed, time.perf_counter() - start
+
+def read_csv_contacts(path):
+    """Yield contact tuples from a CSV file whose header names the CONTACTS_TABLE columns."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        for row in csv.DictReader(file):
+            yield tuple((row.get(column) or "").strip() or None for column in SEARCH_COLUMNS)
+
+def unfold_vcard_lines(file):
+    """Yield vCard content lines, joining continuation lines (starting with a space or tab)."""
+    current = None
+    for line in file:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+def unescape_vcard(value):
+    """Undo vCard escaping of newlines, commas, semicolons and backslashes."""
+    return re.sub(r"\\(.)", lambda match: "\n" if match.group(1) in "nN" else match.group(1), value)
+
+def escape_vcard(value):
+    """Escape text for a vCard property value."""
+    return (value.replace("\\", "\\\\").replace("\n", "\\n")
+            .replace(",", "\\,").replace(";", "\\;"))
+
+def read_vcards(path):
+    """Yield contact tuples from a vCard file, one card at a time.
+
+    The CELL number becomes Mobile_Number, HOME and WORK numbers Phone1 and Phone2;
+    untyped numbers fill whichever of the three is still empty.
+    """
+    card = None
+    with open(path, encoding="utf-8-sig") as file:
+        for line in unfold_vcard_lines(file):
+            prop, _, value = line.partition(":")
+            name, *params = prop.split(";")
+            name = name.rsplit(".", 1)[-1].upper()  # drop "item1." style groups
+            params = ";".join(params).upper()
+
+            if name == "BEGIN" and value.strip().upper() == "VCARD":
+                card = {"numbers": []}
+            elif card is None:
+                continue
+            elif name == "END":
+                yield vcard_contact(card)
+                card = None
+            elif name == "FN":
+                card["FN"] = unescape_vcard(value).strip()
+            elif name == "N":
+                parts = [unescape_vcard(part).strip() for part in re.split(r"(?<!\\);", value)]
+                card["N"] = " ".join(part for part in parts[1:2] + parts[:1] if part)
+            elif name == "TEL":
+                number = value.strip()
+                if number.lower().startswith("tel:"):
+                    number = number[4:]
+                kind = next((kind for kind in ("CELL", "HOME", "WORK") if kind in params), None)
+                card["numbers"].append((kind, number))
+            elif name == "EMAIL" and "EMAIL" not in card:
+                card["EMAIL"] = value.strip()
+            elif name == "NOTE":
+                card["NOTE"] = unescape_vcard(value)
+
+def vcard_contact(card):
+    """Turn the properties collected from one vCard into a contact tuple."""
+    phones = {"CELL": None, "HOME": None, "WORK": None}
+    untyped = []
+    for kind, number in card["numbers"]:
+        if kind is not None and phones[kind] is None:
+            phones[kind] = number
+        else:
+            untyped.append(number)
+    for kind in phones:
+        if phones[kind] is None and untyped:
+            phones[kind] = untyped.pop(0)
+    return (card.get("FN") or card.get("N") or None, phones["CELL"], phones["HOME"], phones["WORK"],
+            card.get("EMAIL"), card.get("NOTE"))
+
+def format_vcard(contact):
+    """Format a contact tuple as a vCard 3.0 card."""
+    name, mobile, phone1, phone2, email, notes = contact
+    lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{escape_vcard(name)}", f"N:;{escape_vcard(name)};;;",
+             f"TEL;TYPE=CELL:{mobile}"]
+    if phone1:
+        lines.append(f"TEL;TYPE=HOME:{phone1}")
+    if phone2:
+        lines.append(f"TEL;TYPE=WORK:{phone2}")
+    if email:
+        lines.append(f"EMAIL;TYPE=INTERNET:{email}")
+    if notes:
+        lines.append(f"NOTE:{escape_vcard(notes)}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
+
+def is_vcard(path):
+    return path.lower().endswith(VCARD_EXTENSIONS)
+
+def read_contact_file(path):
+    """Yield contact tuples from a CSV or vCard file, chosen by extension."""
+    return read_vcards(path) if is_vcard(path) else read_csv_contacts(path)
+
+def export_contacts(con, path):
+    """Stream every contact, in name order, to a CSV or vCard file. Returns (rows, seconds)."""
+    start = time.perf_counter()
+    rows = con.execute(f"SELECT {', '.join(SEARCH_COLUMNS)} FROM CONTACTS_TABLE ORDER BY Name, Mobile_Number")
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        if is_vcard(path):
+            for count, row in enumerate(rows, 1):
+                file.write(format_vcard(row))
+        else:
+            writer = csv.writer(file)
+            writer.writerow(SEARCH_COLUMNS)
+            for count, row in enumerate(rows, 1):
+                writer.writerow(row)
+    return count, time.perf_counter() - start
+
+class ContactRepository:
+    """Owns the contacts database: schema, queries, changes and the search cache."""
+
+    def __init__(self, path=DB_FILENAME, check_same_thread=True):
+        self.con = sqlite3.connect(path, check_same_thread=check_same_thread,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+        self.cursor = self.con.cursor()
+        # WAL lets searches read while another connection (or an import) is writing;
+        # with WAL, NORMAL sync stays safe against corruption and skips an fsync per commit
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        # Recent search results (query -> rows)
+        self.search_cache = OrderedDict()
+        self.create_table()
+
+    def create_table(self):
+        """Create the CONTACTS_TABLE if it does not exist."""
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS CONTACTS_TABLE (
+            Name TEXT NOT NULL, 
+            Mobile_Number TEXT PRIMARY KEY, 
+            Phone1 TEXT, 
+            Phone2 TEXT, 
+            Email TEXT, 
+            Notes TEXT
+        )
+        """)
+        # Keyset pagination walks the list in (Name, Mobile_Number) order
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS CONTACTS_NAME_INDEX ON CONTACTS_TABLE (Name, Mobile_Number)")
+        self.con.commit()
+        self.migrate()
+        self.fts_enabled = self.create_search_index()
+
+    def migrate(self):
+        """Bring a database from an older version of the app up to SCHEMA_VERSION."""
+        if self.cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        with self.con:
+            self.cursor.execute("BEGIN")
+            existing = {row[1] for row in self.cursor.execute("PRAGMA table_info(CONTACTS_TABLE)")}
+            for column in DERIVED_COLUMNS:
+                if column not in existing:
+                    self.cursor.execute(f"ALTER TABLE CONTACTS_TABLE ADD COLUMN {column} TEXT")
+            # The old search trigger re-indexed a contact on every update, derived columns included;
+            # create_search_index() puts back one limited to the searchable columns
+            self.cursor.execute("DROP TRIGGER IF EXISTS CONTACTS_FTS_UPDATE")
+
+            # Fill in the derived columns of existing contacts
+            rows = self.con.execute("SELECT Name, Mobile_Number, Phone1, Phone2, rowid FROM CONTACTS_TABLE")
+            assignments = ", ".join(f"{column} = ?" for column in DERIVED_COLUMNS)
+            while True:
+                batch = rows.fetchmany(IMPORT_BATCH_SIZE)
+                if not batch:
+                    break
+                self.cursor.executemany(f"UPDATE CONTACTS_TABLE SET {assignments} WHERE rowid = ?",
+                                        [with_derived(row[:4])[4:] + (row[4],) for row in batch])
+
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS CONTACTS_NAME_KEY_INDEX "
+                                "ON CONTACTS_TABLE (Name_Key, Mobile_Number)")
+            for column in PHONE_DIGIT_COLUMNS:
+                self.cursor.execute(f"CREATE INDEX IF NOT EXISTS CONTACTS_{column.upper()}_INDEX "
+                                    f"ON CONTACTS_TABLE ({phone_key(column)})")
+            self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def create_search_index(self):
+        """Create the trigram full-text index and the triggers that keep it in sync."""
+        columns = ", ".join(SEARCH_COLUMNS)
+        new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+        old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+        try:
+            self.cursor.executescript(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS CONTACTS_FTS USING fts5(
+                {columns}, content='CONTACTS_TABLE', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS CONTACTS_FTS_INSERT AFTER INSERT ON CONTACTS_TABLE BEGIN
+                INSERT INTO CONTACTS_FTS (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END;
+            CREATE TRIGGER IF NOT EXISTS CONTACTS_FTS_DELETE AFTER DELETE ON CONTACTS_TABLE BEGIN
+                INSERT INTO CONTACTS_FTS (CONTACTS_FTS, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            END;
+            CREATE TRIGGER IF NOT EXISTS CONTACTS_FTS_UPDATE AFTER UPDATE OF {columns} ON CONTACTS_TABLE BEGIN
+                INSERT INTO CONTACTS_FTS (CONTACTS_FTS, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO CONTACTS_FTS (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END;
+            """)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or the trigram tokenizer: fall back to LIKE
+            return False
+
+        # Index contacts that were added before the full-text index existed
+        indexed = self.cursor.execute("SELECT COUNT(*) FROM CONTACTS_FTS_DOCSIZE").fetchone()[0]
+        total = self.cursor.execute("SELECT COUNT(*) FROM CONTACTS_TABLE").fetchone()[0]
+        if indexed != total:
+            self.cursor.execute("INSERT INTO CONTACTS_FTS (CONTACTS_FTS) VALUES ('rebuild')")
+        self.con.commit()
+        return True
+
+    @timed("contacts.add")
+    def add(self, name, mobile, phone1=None, phone2=None, email=None, notes=None):
+        """Save a new contact."""
+        self.cursor.execute(f"INSERT INTO CONTACTS_TABLE ({', '.join(ALL_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' for _ in ALL_COLUMNS)})",
+                            with_derived((name, mobile, phone1, phone2, email, notes)))
+        self.con.commit()
+        self.search_cache.clear()
+
+    @timed("contacts.update")
+    def update(self, mobile, fields):
+        """Change the given {column: value} fields of a contact. Returns whether it exists."""
+        unknown = set(fields) - set(SEARCH_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown contact fields: {', '.join(sorted(unknown))}")
+        fields = dict(fields)
+        for column, source in DERIVED_COLUMNS.items():
+            if source in fields:
+                fields[column] = name_key(fields[source]) if column == "Name_Key" else normalize_phone(fields[source])
+        columns = tuple(sorted(fields))
+        self.cursor.execute(update_sql(columns), [fields[column] for column in columns] + [mobile])
+        self.con.commit()
+        self.search_cache.clear()
+        return self.cursor.rowcount > 0
+
+    @timed("contacts.delete")
+    def delete(self, mobile):
+        """Delete a contact. Returns whether it existed."""
+        self.cursor.execute("DELETE FROM CONTACTS_TABLE WHERE Mobile_Number = ?", (mobile,))
+        self.con.commit()
+        self.search_cache.clear()
+        return self.cursor.rowcount > 0
+
+    def get(self, mobile):
+        """Return the contact's (Name, Mobile_Number, Phone1, Phone2, Email, Notes), or None."""
+        return self.cursor.execute(f"SELECT {', '.join(SEARCH_COLUMNS)} FROM CONTACTS_TABLE "
+                                   "WHERE Mobile_Number = ?", (mobile,)).fetchone()
+
+    def count(self):
+        return self.cursor.execute("SELECT COUNT(*) FROM CONTACTS_TABLE").fetchone()[0]
+
+    def lookup_phone(self, number):
+        """Contacts with the number as their mobile or either phone, exact matches first.
+
+        Numbers match when the shorter one ends the longer, so "+1 555-0100", "1 555 0100"
+        and "5550100" all find each other.
+        """
+        digits = normalize_phone(number)
+        if not digits:
+            return []
+        key = digits[-PHONE_KEY_DIGITS:]
+        condition = " OR ".join(f"{phone_key(column)} = ?" for column in PHONE_DIGIT_COLUMNS)
+        rows = self.cursor.execute(f"SELECT {', '.join(SEARCH_COLUMNS + PHONE_DIGIT_COLUMNS)} "
+                                   f"FROM CONTACTS_TABLE WHERE {condition}", (key,) * len(PHONE_DIGIT_COLUMNS))
+        exact, close = [], []
+        for row in rows:
+            stored = [other for other in row[len(SEARCH_COLUMNS):] if other]
+            if digits in stored:
+                exact.append(row[:len(SEARCH_COLUMNS)])
+            elif any(phones_match(digits, other) for other in stored):
+                close.append(row[:len(SEARCH_COLUMNS)])
+        return exact + close
+
+    def find_duplicates(self):
+        """Yield ("phone" or "name", key, [Mobile_Number, ...]) for each group of likely duplicates.
+
+        Contacts are only compared within blocks sharing a phone-number tail or a name key,
+        read in sorted order from SQLite, so the work grows about linearly with the table.
+        """
+        # Separate cursors: the caller may use the repository while iterating
+        phones = self.con.execute(" UNION ALL ".join(
+            f"SELECT {phone_key(column)} AS block, {column}, Mobile_Number FROM CONTACTS_TABLE "
+            f"WHERE {column} IS NOT NULL" for column in PHONE_DIGIT_COLUMNS) + " ORDER BY block")
+        for key, block in groupby(phones, key=itemgetter(0)):
+            for group in phone_groups([(digits, mobile) for _, digits, mobile in block]):
+                yield "phone", key, group
+
+        names = self.con.execute("SELECT Name_Key, Mobile_Number FROM CONTACTS_TABLE "
+                                 "WHERE Name_Key > '' ORDER BY Name_Key")
+        for key, block in groupby(names, key=itemgetter(0)):
+            mobiles = [mobile for _, mobile in block]
+            if len(mobiles) > 1:
+                yield "name", key, mobiles
+
+    def search(self, search):
+        """Return all (Name, Mobile_Number, searchable text) rows matching the search, sorted by name.
+
+        Returns None when more than SEARCH_CACHE_MAX_ROWS match; those are paged from SQLite instead,
+        and the None is cached too so the next page does not repeat the probe.
+        """
+        key = search.lower()
+        if key in self.search_cache:
+            count("contacts.search_cache_hit")
+            self.search_cache.move_to_end(key)
+            return self.search_cache[key]
+        count("contacts.search_cache_miss")
+
+        # Typing more characters can only narrow the results of a cached shorter query
+        narrowed = None
+        for cached_key in reversed(self.search_cache):
+            if cached_key and cached_key in key and self.search_cache[cached_key] is not None:
+                narrowed = [row for row in self.search_cache[cached_key] if key in row[2]]
+                break
+
+        if narrowed is None:
+            narrowed = self.query(search, limit=SEARCH_CACHE_MAX_ROWS + 1)
+            if len(narrowed) > SEARCH_CACHE_MAX_ROWS:
+                narrowed = None
+
+        self.search_cache[key] = narrowed
+        if len(self.search_cache) > SEARCH_CACHE_SIZE:
+            self.search_cache.popitem(last=False)
+        return narrowed
+
+    def query(self, search, key=None, direction=">", limit=None, full_text=True):
+        """Run the search in SQLite, through the trigram index when possible.
+
+        With a key, only rows after (">"), from (">=") or before ("<") that (Name, Mobile_Number)
+        are returned, so pages are read straight from the name index instead of skipping rows.
+        """
+        mode, params = None, []
+        if search and full_text and self.fts_enabled and len(search) >= 3:
+            # A quoted trigram phrase matches the text anywhere, like LIKE '%...%'
+            mode = "fts"
+            params.append('"' + search.replace('"', '""') + '"')
+        elif search:
+            # Trigrams need at least three characters; shorter searches scan with LIKE
+            mode = "like"
+            params.extend(['%' + search + '%'] * len(SEARCH_COLUMNS))
+        if key is not None:
+            params.extend(key)
+        if limit is not None:
+            params.append(limit)
+
+        sql = search_sql(mode, direction, key is not None, limit is not None)
+        rows = self.cursor.execute(sql, params).fetchall()
+        if direction == "<":
+            rows.reverse()
+        return rows
+
+    def page(self, search, key=None, direction=">"):
+        """Return up to PAGE_SIZE (Name, Mobile_Number) keys next to key in name order."""
+        # One or two characters match too widely to be worth collecting whole: page them from SQLite
+        rows = self.search(search) if len(search) >= 3 else None
+        if rows is None:
+            # Too many matches to cache: a page of a broad search is found sooner by walking the
+            # name index with LIKE than by collecting and sorting every full-text match
+            return [(name, mobile) for name, mobile, _ in
+                    self.query(search, key, direction, PAGE_SIZE, full_text=False)]
+
+        # Small result sets are cached whole, so page through them in memory
+        keys = [(name, mobile) for name, mobile, _ in rows]
+        if key is None:
+            return keys[:PAGE_SIZE]
+        if direction == "<":
+            end = bisect_left(keys, key)
+            return keys[max(end - PAGE_SIZE, 0):end]
+        start = bisect_left(keys, key) if direction == ">=" else bisect_right(keys, key)
+        return keys[start:start + PAGE_SIZE]
+
+    @timed("contacts.import")
+    def import_contacts(self, records, policy="skip"):
+        """Bulk-save contact tuples; see import_contacts()."""
+        try:
+            return import_contacts(self.con, records, policy)
+        finally:
+            self.search_cache.clear()
+
+    def import_file(self, path, policy="skip"):
+        """Bulk-save the contacts in a CSV or vCard file."""
+        return self.import_contacts(read_contact_file(path), policy)
+
+    def export(self, path):
+        """Write every contact to a CSV or vCard file; see export_contacts()."""
+        return export_contacts(self.con, path)
+
+    def close(self):
+        self.con.close()
@@ -1,6 +1,59 @@
-import sqlite3
+import argparse
+import os
+import queue
+import sys
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from functools import partial
+from tkinter import ttk, messagebox, filedialog
+
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from contact_repository import CONFLICT_POLICIES, PAGE_SIZE, ContactRepository  # noqa: E402
+
+# Wait this long after the last keystroke before searching
+SEARCH_DELAY_MS = 250
+# Pages kept in the list at once; rows scrolled further away are dropped
+WINDOW_PAGES = 3
+# Fetch another page once the view is this close to either end of the loaded rows
+SCROLL_MARGIN = 0.1
+# How often the main loop picks up finished database work
+DB_POLL_MS = 20
+CONTACT_FILETYPES = [("CSV files", "*.csv"), ("vCard files", "*.vcf *.vcard"), ("All files", "*.*")]
+
+class DatabaseWorker(threading.Thread):
+    """Runs database calls one at a time on a background thread, off the Tk main loop.
+
+    Results wait in a queue until the main thread hands them to their callbacks.
+    """
+
+    def __init__(self, con):
+        super().__init__(daemon=True)
+        self.con = con
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+
+    def submit(self, func, args=(), callback=None, on_error=None):
+        """Queue func(*args); callback(result), or on_error(error) if it raised, later runs on the main thread."""
+        self.requests.put((func, args, callback, on_error))
+
+    def stop(self):
+        """End the thread once the requests already queued are done."""
+        self.requests.put(None)
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            func, args, callback, on_error = request
+            try:
+                self.results.put((callback, on_error, func(*args), None))
+            except Exception as error:
+                # Report any failure (SQL, unreadable import file, ...) and keep serving requests
+                self.con.rollback()
+                self.results.put((callback, on_error, None, error))
 
 class ContactApp:
     def __init__(self):
@@ -15,27 +68,33 @@ class ContactApp:
         self.style.configure("TLabel", font=("Arial", 12), background="#f0f0f0")
         self.style.configure("TEntry", font=("Arial", 12))
 
-        # Database Connection
-        self.con = sqlite3.connect("contact_book.db")
-        self.cursor = self.con.cursor()
-        self.create_table()
-
+        # Database: after setup the repository is only used from the worker thread
+        self.repo = ContactRepository(check_same_thread=False)
+        self.db = DatabaseWorker(self.repo.con)
+        self.db.start()
+
+        # Search state: pending debounced search and the text it ran with
+        self.search_job = None
+        self.search_text = ""
+
+        # List window: loaded (Name, Mobile_Number) keys in list order, whether more rows exist
+        # on either side, whether a page fetch is in flight, and the view to restore after a refresh.
+        # Each new list bumps the generation, so results for an older list are dropped.
+        self.rows = []
+        self.has_before = self.has_after = False
+        self.page_pending = False
+        self.generation = 0
+        self.anchor = None
+        self.selected = None
+        self.conflict_policy = CONFLICT_POLICIES[0]
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
         self.create_widgets()
-        self.window.mainloop()
+        self.poll_job = self.window.after(DB_POLL_MS, self.poll_db)
 
-    def create_table(self):
-        """Create the CONTACTS_TABLE if it does not exist."""
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS CONTACTS_TABLE (
-            Name TEXT NOT NULL, 
-            Mobile_Number TEXT PRIMARY KEY, 
-            Phone1 TEXT, 
-            Phone2 TEXT, 
-            Email TEXT, 
-            Notes TEXT
-        )
-        """)
-        self.con.commit()
+    def run(self):
+        """Hand control to the Tk main loop until the window closes."""
+        self.window.mainloop()
 
     def create_widgets(self):
         """Main UI Components"""
@@ -50,18 +109,26 @@ class ContactApp:
 
         self.search_entry = ttk.Entry(search_frame, width=40)
         self.search_entry.pack(side=tk.LEFT, padx=5)
-        self.search_entry.bind("<KeyRelease>", lambda event: self.show_contacts())
+        self.search_entry.insert(0, self.search_text)
+        self.search_entry.bind("<KeyRelease>", lambda event: self.schedule_search())
 
         search_button = ttk.Button(search_frame, text="🔍 Search", command=self.show_contacts)
         search_button.pack(side=tk.LEFT, padx=5)
 
-        # Contact List
-        self.contact_list = ttk.Treeview(self.window, columns=("Name", "Mobile"), show="headings")
+        # Contact List (only a window of rows is loaded; scrolling fetches more)
+        list_frame = tk.Frame(self.window, bg="#f0f0f0")
+        list_frame.pack(pady=10)
+
+        self.contact_list = ttk.Treeview(list_frame, columns=("Name", "Mobile"), show="headings",
+                                         yscrollcommand=self.on_list_scroll)
         self.contact_list.heading("Name", text="Name")
         self.contact_list.heading("Mobile", text="Mobile Number")
         self.contact_list.column("Name", width=250)
         self.contact_list.column("Mobile", width=150)
-        self.contact_list.pack(pady=10)
+        self.contact_list.pack(side=tk.LEFT)
+
+        self.scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.contact_list.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # Buttons
         btn_frame = tk.Frame(self.window, bg="#f0f0f0")
@@ -71,10 +138,23 @@ class ContactApp:
         ttk.Button(btn_frame, text="✏️ Edit Contact", command=self.edit_contact_ui).pack(side=tk.LEFT, padx=10)
         ttk.Button(btn_frame, text="🗑️ Delete Contact", command=self.delete_contact).pack(side=tk.LEFT, padx=10)
 
-        self.show_contacts()
+        # Bulk import / export
+        file_frame = tk.Frame(self.window, bg="#f0f0f0")
+        file_frame.pack(pady=5)
+
+        ttk.Button(file_frame, text="📥 Import", command=self.import_contacts_ui).pack(side=tk.LEFT, padx=10)
+        ttk.Label(file_frame, text="On duplicate:").pack(side=tk.LEFT)
+        self.conflict_choice = ttk.Combobox(file_frame, values=CONFLICT_POLICIES, state="readonly", width=10)
+        self.conflict_choice.set(self.conflict_policy)
+        self.conflict_choice.pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="📤 Export", command=self.export_contacts_ui).pack(side=tk.LEFT, padx=10)
+
+        self.show_contacts(self.anchor)
 
     def clear(self):
         """Clear all widgets from the window."""
+        self.generation += 1
+        self.page_pending = False
         for widget in self.window.winfo_children():
             widget.destroy()
 
@@ -94,6 +174,7 @@ class ContactApp:
 
     def contact_form(self, title, save_command, name="", mobile=""):
         """Reusable Contact Form"""
+        self.remember_view()
         self.clear()
         tk.Label(self.window, text=title, font=("Arial", 16, "bold"), bg="#f0f0f0").pack(pady=10)
 
@@ -137,28 +218,131 @@ class ContactApp:
             messagebox.showerror("Error", "Name and Mobile Number are required!")
             return
 
-        self.cursor.execute("INSERT INTO CONTACTS_TABLE (Name, Mobile_Number) VALUES (?, ?)", (name, mobile))
-        self.con.commit()
-        messagebox.showinfo("Success", "Contact added successfully!")
-        self.create_widgets()
+        self.db.submit(self.repo.add, (name, mobile), partial(self.contact_saved, "Contact added successfully!", mobile))
 
     def update_contact_to_db(self):
         """Update an existing contact."""
         name = self.name_entry.get().strip()
         mobile = self.mobile_entry.get().strip()
-        self.cursor.execute("UPDATE CONTACTS_TABLE SET Name = ? WHERE Mobile_Number = ?", (name, mobile))
-        self.con.commit()
-        messagebox.showinfo("Success", "Contact updated successfully!")
+        self.db.submit(self.repo.update, (mobile, {"Name": name}), partial(self.contact_saved, "Contact updated successfully!", mobile))
+
+    def contact_saved(self, message, mobile, _):
+        """Confirm a saved contact and return to the list with it selected."""
+        self.selected = mobile
+        messagebox.showinfo("Success", message)
         self.create_widgets()
 
-    def show_contacts(self):
-        """Display all contacts."""
-        search = self.search_entry.get().strip()
+    def schedule_search(self):
+        """Debounce keystrokes: search once typing pauses for SEARCH_DELAY_MS."""
+        if self.search_job is not None:
+            self.window.after_cancel(self.search_job)
+        self.search_job = self.window.after(SEARCH_DELAY_MS, self.show_contacts)
+
+    @instrumentation.timed("contacts.show_contacts")
+    def show_contacts(self, anchor=None):
+        """Display the contacts matching the search box, scrolled to the anchor key if given."""
+        self.search_job = None
+        self.search_text = self.search_entry.get().strip()
+        # Until the new rows arrive, scrolling must not page the old list
+        self.generation += 1
+        self.has_before = self.has_after = self.page_pending = False
+        self.db.submit(self.read_window, (self.generation, self.search_text, anchor),
+                       partial(self.fill_list, self.generation))
+
+    @instrumentation.timed("contacts.read_window")
+    def read_window(self, generation, search, anchor):
+        """Fetch the page at the anchor plus the one above it (on the database worker)."""
+        if generation != self.generation:
+            return None  # A newer search was queued behind this one
+        rows = self.repo.page(search, anchor, ">=")
+        above = []
+        if anchor is not None:
+            above = self.repo.page(search, rows[0] if rows else anchor, "<")
+        return above, rows
+
+    def fill_list(self, generation, window):
+        """Replace the list with freshly read rows, unless a newer list superseded them."""
+        if generation != self.generation or window is None:
+            return
+        above, rows = window
         self.contact_list.delete(*self.contact_list.get_children())
-
-        query = "SELECT Name, Mobile_Number FROM CONTACTS_TABLE WHERE Name LIKE ? ORDER BY Name ASC"
-        for row in self.cursor.execute(query, ('%' + search + '%',)):
-            self.contact_list.insert("", "end", values=row)
+        self.rows = above + rows
+        self.has_before = len(above) == PAGE_SIZE
+        self.has_after = len(rows) == PAGE_SIZE
+
+        for name, mobile in self.rows:
+            self.contact_list.insert("", "end", iid=mobile, values=(name, mobile))
+        if above:
+            self.contact_list.yview_moveto(len(above) / len(self.rows))
+        if self.selected is not None and self.contact_list.exists(self.selected):
+            self.contact_list.selection_set(self.selected)
+
+    def on_list_scroll(self, first, last):
+        """Move the scrollbar and fetch another page when the view nears an end of the loaded rows."""
+        self.scrollbar.set(first, last)
+        if self.page_pending:
+            return
+        if float(last) > 1 - SCROLL_MARGIN and self.has_after:
+            self.request_page(">")
+        elif float(first) < SCROLL_MARGIN and self.has_before:
+            self.request_page("<")
+
+    def request_page(self, direction):
+        """Ask the worker for the page after (">") or before ("<") the loaded rows."""
+        self.page_pending = True
+        key = self.rows[-1] if direction == ">" else self.rows[0]
+        self.db.submit(self.repo.page, (self.search_text, key, direction),
+                       partial(self.add_page, self.generation, direction),
+                       partial(self.page_failed, self.generation))
+
+    def page_failed(self, generation, error):
+        """Let scrolling ask for the page again after a failed fetch."""
+        if generation == self.generation:
+            self.page_pending = False
+
+    def add_page(self, generation, direction, rows):
+        """Add a fetched page to the list and drop rows beyond the window."""
+        if generation != self.generation:
+            return
+        self.page_pending = False
+        # Row at the top of the view, kept in place while rows come and go around it
+        top = round(float(self.contact_list.yview()[0]) * len(self.rows))
+
+        if direction == ">":
+            self.has_after = len(rows) == PAGE_SIZE
+            for name, mobile in rows:
+                self.contact_list.insert("", "end", iid=mobile, values=(name, mobile))
+            self.rows.extend(rows)
+            excess = len(self.rows) - WINDOW_PAGES * PAGE_SIZE
+            if excess > 0:
+                self.contact_list.delete(*(mobile for _, mobile in self.rows[:excess]))
+                del self.rows[:excess]
+                self.has_before = True
+                top -= excess
+        else:
+            self.has_before = len(rows) == PAGE_SIZE
+            for index, (name, mobile) in enumerate(rows):
+                self.contact_list.insert("", index, iid=mobile, values=(name, mobile))
+            self.rows[:0] = rows
+            top += len(rows)
+            excess = len(self.rows) - WINDOW_PAGES * PAGE_SIZE
+            if excess > 0:
+                self.contact_list.delete(*(mobile for _, mobile in self.rows[-excess:]))
+                del self.rows[-excess:]
+                self.has_after = True
+
+        if rows:
+            self.contact_list.yview_moveto(top / len(self.rows))
+
+    def remember_view(self):
+        """Remember the top visible row and the selection so the next refresh can restore them."""
+        self.anchor = self.selected = None
+        if self.rows:
+            top = int(float(self.contact_list.yview()[0]) * len(self.rows))
+            self.anchor = self.rows[min(top, len(self.rows) - 1)]
+        selection = self.contact_list.selection()
+        if selection:
+            self.selected = selection[0]
 
     def delete_contact(self):
         """Delete a selected contact."""
@@ -168,10 +352,114 @@ class ContactApp:
             return
 
         name, mobile = self.contact_list.item(selected, "values")
-        self.cursor.execute("DELETE FROM CONTACTS_TABLE WHERE Mobile_Number = ?", (mobile,))
-        self.con.commit()
+        self.remember_view()
+        self.db.submit(self.repo.delete, (mobile,), partial(self.contact_deleted, name))
+
+    def contact_deleted(self, name, _):
+        """Confirm a deletion and refresh the list in place."""
         messagebox.showinfo("Success", f"{name} deleted!")
-        self.show_contacts()
+        self.show_contacts(self.anchor)
+
+    def import_contacts_ui(self):
+        """Pick a CSV or vCard file and import it on the worker."""
+        path = filedialog.askopenfilename(title="Import Contacts", filetypes=CONTACT_FILETYPES)
+        if not path:
+            return
+        self.conflict_policy = self.conflict_choice.get()
+        self.remember_view()
+        self.db.submit(self.repo.import_file, (path, self.conflict_policy), self.contacts_imported)
+
+    def contacts_imported(self, result):
+        """Report an import and refresh the list in place."""
+        read, rejected, changed, seconds = result
+        messagebox.showinfo("Import", f"Read {read} contacts in {seconds:.1f}s ({read / max(seconds, 1e-6):,.0f}/s).\n"
+                                      f"{changed} added or updated, {read - rejected - changed} unchanged, "
+                                      f"{rejected} missing a name or mobile number.")
+        self.show_contacts(self.anchor)
+
+    def export_contacts_ui(self):
+        """Pick a CSV or vCard file and export every contact to it on the worker."""
+        path = filedialog.asksaveasfilename(title="Export Contacts", defaultextension=".csv",
+                                            filetypes=CONTACT_FILETYPES)
+        if path:
+            self.db.submit(self.repo.export, (path,), self.contacts_exported)
+
+    def contacts_exported(self, result):
+        """Report an export."""
+        count, seconds = result
+        messagebox.showinfo("Export", f"Exported {count} contacts in {seconds:.1f}s ({count / max(seconds, 1e-6):,.0f}/s).")
+
+    def poll_db(self):
+        """Hand finished database work to its callbacks, then check again shortly.
+
+        The next check is scheduled even if a callback raises, so one failure
+        (reported by Tk) does not stop the window from hearing from the database.
+        """
+        try:
+            while True:
+                try:
+                    callback, on_error, result, error = self.db.results.get_nowait()
+                except queue.Empty:
+                    break
+                if error is not None:
+                    # Undo the request's bookkeeping first, so the dialog's own event loop
+                    # cannot run into a half-finished state
+                    if on_error is not None:
+                        on_error(error)
+                    messagebox.showerror("Error", str(error))
+                elif callback is not None:
+                    callback(result)
+        finally:
+            self.poll_job = self.window.after(DB_POLL_MS, self.poll_db)
+
+    def close(self):
+        """Let the worker finish its queued work, then close the database and the window."""
+        self.window.after_cancel(self.poll_job)
+        self.db.stop()
+        self.db.join()
+        self.repo.close()
+        self.window.destroy()
+
+def main(argv=None):
+    """Open the window, or import/export contacts from the command line without one."""
+    parser = argparse.ArgumentParser(description="Contact book. Without a command, opens the window.")
+    commands = parser.add_subparsers(dest="command")
+    import_parser = commands.add_parser("import", help="import contacts from a CSV or vCard file")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default=CONFLICT_POLICIES[0],
+                               help="what to do with a mobile number that is already saved")
+    export_parser = commands.add_parser("export", help="export every contact to a CSV or vCard file")
+    export_parser.add_argument("file")
+    lookup_parser = commands.add_parser("lookup", help="find the contacts that have a phone number")
+    lookup_parser.add_argument("number")
+    commands.add_parser("duplicates", help="list groups of contacts that share a number or a name")
+    args = parser.parse_args(instrumentation.configure(argv))
+
+    if args.command is None:
+        ContactApp().run()
+        return
+
+    repo = ContactRepository()
+    try:
+        if args.command == "import":
+            read, rejected, changed, seconds = repo.import_file(args.file, args.on_conflict)
+            print(f"Read {read} contacts in {seconds:.1f}s ({read / max(seconds, 1e-6):,.0f}/s): "
+                  f"{changed} added or updated, {read - rejected - changed} unchanged, "
+                  f"{rejected} missing a name or mobile number.")
+        elif args.command == "export":
+            count, seconds = repo.export(args.file)
+            print(f"Exported {count} contacts in {seconds:.1f}s ({count / max(seconds, 1e-6):,.0f}/s).")
+        elif args.command == "lookup":
+            contacts = repo.lookup_phone(args.number)
+            for name, mobile, phone1, phone2, email, _ in contacts:
+                print(f"{name}: {', '.join(phone for phone in (mobile, phone1, phone2, email) if phone)}")
+            if not contacts:
+                print("No contact has that number.")
+        else:
+            for reason, key, mobiles in repo.find_duplicates():
+                print(f"Same {reason} ({key}): {', '.join(mobiles)}")
+    finally:
+        repo.close()
 
 if __name__ == "__main__":
-    ContactApp()
+    main()
@@ -0,0 +1,230 @@
+"""Shared timing and counters for the tools in this repository.
+
+Instrumentation is off unless asked for. While it is off nothing is recorded,
+but the hooks still run: a timed function checks a flag on every call, and
+timer() and count() are ordinary function calls that check the same flag
+(current() lets a hot loop skip the timed wrapper altogether). Turn it on for
+one run with the RD_PROFILE environment variable or the --profile flag:
+
+    RD_PROFILE=1 python calculator.py            text report on stderr at exit
+    python app.py --profile=stats.json           JSON report in stats.json
+    python app.py --profile=1,run.prof           text report plus a cProfile of the main thread
+
+Targets can be combined with commas: 1 (or text) for stderr, a .json file, a
+.prof file for cProfile stats, or any other file name for the text report.
+Each tool's entry point passes its arguments through configure(), which
+handles --profile and returns the rest for the tool's own parser.
+"""
+import atexit
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+ENV_VAR = "RD_PROFILE"
+FLAG = "--profile"
+# Latency buckets hold 2**SUB_BUCKET_BITS steps per power of two, so percentiles are within about 12%
+SUB_BUCKET_BITS = 2
+# Functions listed from the cProfile stats in the text report
+PROFILE_TOP_FUNCTIONS = 20
+
+enabled = False
+_targets = []
+_profiler = None
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Call count, total and log-scale latency buckets for one timed name."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = {}  # bucket lower bound in ns -> calls
+
+    def record(self, ns):
+        shift = max(ns.bit_length() - SUB_BUCKET_BITS - 1, 0)
+        bucket = ns >> shift << shift
+        with _lock:
+            self.count += 1
+            self.total_ns += ns
+            self.max_ns = max(self.max_ns, ns)
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """Estimated latency in ns below which the given fraction of calls fall."""
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                width = 1 << max(bucket.bit_length() - SUB_BUCKET_BITS - 1, 0)
+                return min(bucket + width // 2, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        return {
+            "calls": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / max(self.count, 1) / 1e3,
+            "p50_us": self.percentile(0.5) / 1e3,
+            "p99_us": self.percentile(0.99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+class _Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.record(time.perf_counter_ns() - self.start)
+        return False
+
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def histogram(name):
+    """The histogram recording name, created on first use."""
+    with _lock:
+        return _histograms.setdefault(name, Histogram())
+
+
+def timed(name):
+    """Decorator recording the latency of every call under name.
+
+    Whether to record is decided per call, since the entry point may turn
+    instrumentation on after the function is defined.
+    """
+    def decorate(func):
+        calls = histogram(name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                calls.record(time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def current(func):
+    """The function a hot path should bind now: a timed function's original
+    while instrumentation is off, so it skips even the flag check."""
+    return func if enabled else getattr(func, "__wrapped__", func)
+
+
+def timer(name):
+    """Context manager recording how long its block takes under name."""
+    return _Timer(histogram(name)) if enabled else _NULL_TIMER
+
+
+def count(name, amount=1):
+    """Add amount to the counter name."""
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+def snapshot():
+    """Everything recorded so far, as plain data."""
+    with _lock:
+        histograms = dict(_histograms)
+        counters = dict(_counters)
+    return {
+        "timings": {name: calls.summary() for name, calls in sorted(histograms.items()) if calls.count},
+        "counters": dict(sorted(counters.items())),
+    }
+
+
+def report():
+    """The recorded timings and counters as a text table."""
+    data = snapshot()
+    if not data["timings"] and not data["counters"] and _profiler is None:
+        return "Profiling: nothing was recorded"
+    lines = [f"{'timing':<36}{'calls':>10}{'total ms':>12}{'mean us':>11}{'p50 us':>11}{'p99 us':>11}{'max us':>11}"]
+    for name, numbers in data["timings"].items():
+        lines.append(f"{name:<36}{numbers['calls']:>10}{numbers['total_ms']:>12.1f}{numbers['mean_us']:>11.1f}"
+                     f"{numbers['p50_us']:>11.1f}{numbers['p99_us']:>11.1f}{numbers['max_us']:>11.1f}")
+    if data["counters"]:
+        lines.append(f"\n{'counter':<36}{'count':>10}")
+        lines.extend(f"{name:<36}{value:>10}" for name, value in data["counters"].items())
+    if _profiler is not None:
+        stream = io.StringIO()
+        pstats.Stats(_profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        lines.append(stream.getvalue())
+    return "\n".join(lines)
+
+
+def dump():
+    """Write the report to every target; registered to run at exit."""
+    if _profiler is not None:
+        _profiler.disable()
+    for target in _targets:
+        if target in ("1", "text"):
+            print("\n" + report(), file=sys.stderr)
+        elif target.endswith(".json"):
+            with open(target, "w") as file:
+                json.dump(snapshot(), file, indent=4)
+        elif target.endswith(".prof"):
+            _profiler.dump_stats(target)
+        else:
+            with open(target, "w") as file:
+                file.write(report() + "\n")
+
+
+def enable(targets=("1",)):
+    """Start recording, and report to targets at exit (see the module docstring)."""
+    global enabled, _profiler
+    if enabled:
+        return
+    enabled = True
+    _targets.extend(targets)
+    if any(target.endswith(".prof") for target in targets):
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(dump)
+
+
+def _parse_targets(spec):
+    """The targets in a comma-separated spec; 0 and empty entries mean none."""
+    return [target for target in spec.split(",") if target and target != "0"]
+
+
+def configure(argv=None):
+    """Enable instrumentation for any --profile or --profile=TARGETS in argv.
+
+    argv defaults to sys.argv[1:] and is left unchanged. Returns the other
+    arguments, for the tool's own parser.
+    """
+    remaining, requested = [], []
+    for arg in sys.argv[1:] if argv is None else argv:
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            requested.extend(_parse_targets(arg.partition("=")[2] or "1"))
+        else:
+            remaining.append(arg)
+    if requested:
+        enable(requested)
+    return remaining
+
+
+_environment_targets = _parse_targets(os.environ.get(ENV_VAR, ""))
+if _environment_targets:
+    enable(_environment_targets)
@@ -0,0 +1,335 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+try:
+    import numpy as np  # NumPy is only needed for the simulator
+except ImportError:
+    np = None
+
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from instrumentation import timed  # noqa: E402
+
+# Game options, in the order the simulator numbers them (rock = 0, paper = 1, scissors = 2)
+CHOICES = ["rock", "paper", "scissors"]
+
+# Win table: each choice and the choice it beats
+BEATS = {"rock": "scissors", "paper": "rock", "scissors": "paper"}
+
+# Round outcomes, from the first player's side
+TIE, WIN, LOSS = 0, 1, -1
+
+# Function to decide a round for the user
+def outcome(user_choice, computer_choice):
+    if user_choice == computer_choice:
+        return TIE
+    if BEATS[user_choice] == computer_choice:
+        return WIN
+    return LOSS
+
+# Outcome of every pairing, OUTCOMES[a][b] for CHOICES[a] against CHOICES[b]
+OUTCOMES = [[outcome(a, b) for b in CHOICES] for a in CHOICES]
+
+# The move that beats each move, COUNTER[m] for CHOICES[m]
+COUNTER = [next(CHOICES.index(c) for c in CHOICES if BEATS[c] == choice) for choice in CHOICES]
+
+# Markov predictor counts are halved past this, so old habits fade and counts stay small
+MARKOV_COUNT_LIMIT = 1000
+
+# Function to make sure NumPy is available before simulating
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("The simulator requires NumPy. Install it with: pip install numpy")
+
+# Strategies play round by round: choose(rng) returns a move index (rng is a
+# random.Random, or the random module itself), then observe(own, opponent) is told
+# what both sides played, and reset() forgets everything before a new game.
+# Strategies that never look at the opponent also have moves(size, rng), drawing a
+# whole match in one NumPy call; size is the shape of the move array.
+class RandomStrategy:
+    def __init__(self, weights=None):
+        self.name = "random" if weights is None else "weighted"
+        self.weights = weights
+        self.p = None if weights is None else [weight / sum(weights) for weight in weights]
+
+    def choose(self, rng):
+        if self.weights is None:
+            return rng.randrange(len(CHOICES))
+        return rng.choices(range(len(CHOICES)), self.weights)[0]
+
+    def observe(self, own, opponent):
+        pass
+
+    def reset(self):
+        pass
+
+    def moves(self, size, rng):
+        if self.p is None:
+            return rng.integers(0, len(CHOICES), size=size, dtype=np.int8)
+        return rng.choice(len(CHOICES), size=size, p=self.p).astype(np.int8)
+
+class ConstantStrategy:
+    def __init__(self, choice):
+        self.name = choice
+        self.move = CHOICES.index(choice)
+
+    def choose(self, rng):
+        return self.move
+
+    def observe(self, own, opponent):
+        pass
+
+    def reset(self):
+        pass
+
+    def moves(self, size, rng):
+        return np.full(size, self.move, dtype=np.int8)
+
+class CycleStrategy:
+    def __init__(self, sequence=CHOICES):
+        self.name = "cycle"
+        self.cycle = [CHOICES.index(choice) for choice in sequence]
+        self.position = 0
+
+    def choose(self, rng):
+        return self.cycle[self.position]
+
+    def observe(self, own, opponent):
+        self.position = (self.position + 1) % len(self.cycle)
+
+    def reset(self):
+        self.position = 0
+
+    def moves(self, size, rng):
+        rounds = size if isinstance(size, int) else size[-1]
+        return np.broadcast_to(np.resize(np.array(self.cycle, dtype=np.int8), rounds), size)
+
+# Reactive strategies: answer the opponent's previous move
+class BeatLastStrategy:
+    name = "beat_last"
+
+    def __init__(self):
+        self.last = None
+
+    def choose(self, rng):
+        return rng.randrange(len(CHOICES)) if self.last is None else COUNTER[self.last]
+
+    def observe(self, own, opponent):
+        self.last = opponent
+
+    def reset(self):
+        self.last = None
+
+class CopyStrategy(BeatLastStrategy):
+    name = "copy"
+
+    def choose(self, rng):
+        return rng.randrange(len(CHOICES)) if self.last is None else self.last
+
+# Predicts the opponent's next move from their last order moves (an n-gram /
+# Markov model) and plays what beats it. Counts live in one flat list of
+# 3 ** (order + 1) entries, so each update is O(1) and memory never grows;
+# counts are halved at MARKOV_COUNT_LIMIT so the model follows a changing player.
+class MarkovStrategy:
+    def __init__(self, order=2):
+        self.name = f"markov{order}"
+        self.contexts = len(CHOICES) ** order
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (self.contexts * len(CHOICES))
+        self.context = 0
+
+    def predict(self, rng):
+        base = self.context * len(CHOICES)
+        row = self.counts[base:base + len(CHOICES)]
+        best = max(row)
+        if best == 0:
+            return rng.randrange(len(CHOICES))
+        likely = [move for move, count in enumerate(row) if count == best]
+        return likely[0] if len(likely) == 1 else rng.choice(likely)
+
+    def choose(self, rng):
+        return COUNTER[self.predict(rng)]
+
+    def observe(self, own, opponent):
+        base = self.context * len(CHOICES)
+        self.counts[base + opponent] += 1
+        if self.counts[base + opponent] > MARKOV_COUNT_LIMIT:
+            for index in range(base, base + len(CHOICES)):
+                self.counts[index] //= 2
+        self.context = (self.context * len(CHOICES) + opponent) % self.contexts
+
+# Strategies by name, for the command line
+STRATEGIES = {
+    "random": RandomStrategy,
+    "cycle": CycleStrategy,
+    "rock": lambda: ConstantStrategy("rock"),
+    "paper": lambda: ConstantStrategy("paper"),
+    "scissors": lambda: ConstantStrategy("scissors"),
+    "beat_last": BeatLastStrategy,
+    "copy": CopyStrategy,
+    "frequency": lambda: MarkovStrategy(order=0),
+    "markov1": lambda: MarkovStrategy(order=1),
+    "markov2": lambda: MarkovStrategy(order=2),
+    "markov3": lambda: MarkovStrategy(order=3),
+}
+
+# Moves and outcomes of a simulated match. Arrays have one entry per round, or
+# one row per game when several games were played at once; outcomes are from
+# player a's side.
+class SimulationResult:
+    def __init__(self, name_a, name_b, moves_a, moves_b, outcomes):
+        self.name_a = name_a
+        self.name_b = name_b
+        self.moves_a = moves_a
+        self.moves_b = moves_b
+        self.outcomes = outcomes
+
+    # Running scores after each round, like user_score and computer_score in the game
+    def scores_a(self):
+        return np.cumsum(self.outcomes == WIN, axis=-1, dtype=np.int64)
+
+    def scores_b(self):
+        return np.cumsum(self.outcomes == LOSS, axis=-1, dtype=np.int64)
+
+    # Win/loss/tie counts and rates, with the standard error of a's win rate
+    def stats(self):
+        losses, ties, wins = np.bincount((self.outcomes + 1).ravel(), minlength=3)
+        rounds = int(self.outcomes.size)
+        win_rate = wins / rounds
+        stats = {
+            "rounds": rounds,
+            "wins_a": int(wins),
+            "wins_b": int(losses),
+            "ties": int(ties),
+            "win_rate_a": float(win_rate),
+            "win_rate_b": float(losses / rounds),
+            "tie_rate": float(ties / rounds),
+            "win_rate_a_stderr": float(np.sqrt(win_rate * (1 - win_rate) / rounds)),
+        }
+        if self.outcomes.ndim == 2:
+            # Several games: who won each one on final score
+            final = np.sign((self.outcomes == WIN).sum(axis=1) - (self.outcomes == LOSS).sum(axis=1))
+            stats["games"] = len(final)
+            stats["games_won_a"] = int((final == 1).sum())
+            stats["games_won_b"] = int((final == -1).sum())
+            stats["games_tied"] = int((final == 0).sum())
+        return stats
+
+# Function to play one game round by round, for strategies that react to each other
+def _play_rounds(strategy_a, strategy_b, rounds, rng):
+    strategy_a.reset()
+    strategy_b.reset()
+    choose_a, choose_b = strategy_a.choose, strategy_b.choose
+    observe_a, observe_b = strategy_a.observe, strategy_b.observe
+    moves_a, moves_b = bytearray(rounds), bytearray(rounds)
+    for index in range(rounds):
+        a = choose_a(rng)
+        b = choose_b(rng)
+        observe_a(a, b)
+        observe_b(b, a)
+        moves_a[index] = a
+        moves_b[index] = b
+    return moves_a, moves_b
+
+# Function to play strategy a against strategy b for the given number of rounds
+# (in each of games games). When neither strategy reacts to the other, every move
+# is drawn at once; otherwise the moves are played out round by round. Either way
+# all rounds are then decided at once through the win table.
+@timed("rps.simulate")
+def simulate(strategy_a, strategy_b, rounds, games=1, seed=None):
+    _require_numpy()
+    if rounds < 1 or games < 1:
+        raise ValueError("rounds and games must be at least 1")
+    size = rounds if games == 1 else (games, rounds)
+    if hasattr(strategy_a, "moves") and hasattr(strategy_b, "moves"):
+        rng = np.random.default_rng(seed)
+        moves_a = strategy_a.moves(size, rng)
+        moves_b = strategy_b.moves(size, rng)
+    else:
+        rng = random.Random(seed)
+        played = [_play_rounds(strategy_a, strategy_b, rounds, rng) for _ in range(games)]
+        moves_a = np.frombuffer(b"".join(a for a, _ in played), dtype=np.int8).reshape(size)
+        moves_b = np.frombuffer(b"".join(b for _, b in played), dtype=np.int8).reshape(size)
+    table = np.array(OUTCOMES, dtype=np.int8).ravel()
+    outcomes = table[moves_a * len(CHOICES) + moves_b]
+    return SimulationResult(strategy_a.name, strategy_b.name, moves_a, moves_b, outcomes)
+
+# Function to play one tournament matchup in a worker process (strategies are
+# passed by name, since instances may not pickle)
+def _play_matchup(matchup):
+    name_a, name_b, rounds, games, seed = matchup
+    start = time.perf_counter()
+    stats = simulate(STRATEGIES[name_a](), STRATEGIES[name_b](), rounds, games, seed).stats()
+    return name_a, name_b, stats, time.perf_counter() - start
+
+# Function to play every strategy against every other one, spreading the matchups
+# over a process pool. Returns {name: totals} with wins, losses, ties, rounds,
+# seconds spent in its matchups, rounds per second and win rate, best first.
+@timed("rps.tournament")
+def tournament(names=None, rounds=100000, games=1, jobs=None, seed=0):
+    names = list(names or STRATEGIES)
+    matchups = [(a, b, rounds, games, seed + index) for index, (a, b) in enumerate(combinations(names, 2))]
+    totals = {name: {"wins": 0, "losses": 0, "ties": 0, "rounds": 0, "seconds": 0.0} for name in names}
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for name_a, name_b, stats, seconds in pool.map(_play_matchup, matchups):
+            for name, wins, losses in ((name_a, stats["wins_a"], stats["wins_b"]),
+                                       (name_b, stats["wins_b"], stats["wins_a"])):
+                total = totals[name]
+                total["wins"] += wins
+                total["losses"] += losses
+                total["ties"] += stats["ties"]
+                total["rounds"] += stats["rounds"]
+                total["seconds"] += seconds
+    for total in totals.values():
+        total["rounds_per_sec"] = total["rounds"] / max(total["seconds"], 1e-9)
+        total["win_rate"] = total["wins"] / max(total["rounds"], 1)
+    return dict(sorted(totals.items(), key=lambda item: item[1]["wins"] - item[1]["losses"], reverse=True))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Rock-Paper-Scissors matches between strategies.")
+    parser.add_argument("strategies", nargs="*", metavar="STRATEGY",
+                        help=f"two strategies to match, or any for a tournament ({', '.join(STRATEGIES)})")
+    parser.add_argument("-r", "--rounds", type=int, default=1000000, help="rounds per game")
+    parser.add_argument("-g", "--games", type=int, default=1, help="number of games")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable runs")
+    parser.add_argument("-t", "--tournament", action="store_true",
+                        help="play every strategy given (default: all) against every other")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes for a tournament (default: CPU count)")
+    args = parser.parse_args(instrumentation.configure(argv))
+    unknown = [name for name in args.strategies if name not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategy: {', '.join(unknown)}")
+    if args.rounds < 1 or args.games < 1:
+        parser.error("--rounds and --games must be at least 1")
+
+    if args.tournament:
+        totals = tournament(args.strategies, args.rounds, args.games, args.jobs, args.seed or 0)
+        print(f"{'strategy':<12}{'wins':>12}{'losses':>12}{'ties':>12}{'win rate':>10}{'rounds/s':>12}")
+        for name, total in totals.items():
+            print(f"{name:<12}{total['wins']:>12}{total['losses']:>12}{total['ties']:>12}"
+                  f"{total['win_rate']:>10.2%}{total['rounds_per_sec']:>12,.0f}")
+        return
+    if len(args.strategies) != 2:
+        parser.error("give two strategies, or --tournament")
+
+    args.strategy_a, args.strategy_b = args.strategies
+    result = simulate(STRATEGIES[args.strategy_a](), STRATEGIES[args.strategy_b](),
+                      args.rounds, args.games, args.seed)
+    stats = result.stats()
+    print(f"{result.name_a} vs {result.name_b}: {stats['rounds']} rounds")
+    print(f"  {result.name_a} wins {stats['win_rate_a']:.2%} (± {stats['win_rate_a_stderr']:.2%}), "
+          f"{result.name_b} wins {stats['win_rate_b']:.2%}, ties {stats['tie_rate']:.2%}")
+    if "games" in stats:
+        print(f"  Games: {result.name_a} {stats['games_won_a']}, {result.name_b} {stats['games_won_b']}, "
+              f"tied {stats['games_tied']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from engine import CHOICES  # noqa: E402
+from server import HOST, PORT  # noqa: E402
+
+# Load generator for server.py: opens many sessions at once, each playing its
+# rounds as fast as the replies come back, then reports rounds per second and
+# round latency (from sending a move to reading its RESULT line).
+#
+#   python loadgen.py --local                      start a server on a free port and load it
+#   python loadgen.py --sessions 2000 --rounds 200 load a server that is already running
+#   python loadgen.py --local --pvp                pair the sessions up against each other
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+# Function to read reply lines until one starts with the expected word
+async def expect(reader, word):
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError(f"server closed the connection while waiting for {word}")
+        if line.startswith(word):
+            return line
+
+# Function to run one session, appending each round's latency in seconds
+async def run_session(host, port, rounds, pvp, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random()
+    try:
+        await expect(reader, b"WELCOME")
+        if pvp:
+            writer.write(b"match\n")
+            await expect(reader, b"MATCHED")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            writer.write(rng.choice(CHOICES).encode() + b"\n")
+            await writer.drain()
+            await expect(reader, b"RESULT")
+            latencies.append(time.perf_counter() - start)
+        writer.write(b"exit\n")
+        await writer.drain()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+# Function to start server.py on a free port and return the process and port
+async def start_local_server(opponent):
+    process = await asyncio.create_subprocess_exec(sys.executable, SERVER_SCRIPT, "--port", "0",
+                                                   "--opponent", opponent, stdout=asyncio.subprocess.PIPE)
+    line = await process.stdout.readline()
+    if not line:
+        raise RuntimeError("the local server did not start")
+    return process, int(line.rsplit(b":", 1)[1])
+
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+async def run(args):
+    process = None
+    host, port = args.host, args.port
+    if args.local:
+        process, port = await start_local_server(args.opponent)
+    try:
+        latencies = []
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run_session(host, port, args.rounds, args.pvp, latencies)
+                                         for _ in range(args.sessions)), return_exceptions=True)
+        seconds = time.perf_counter() - start
+    finally:
+        if process is not None:
+            process.terminate()
+            await process.wait()
+
+    failed = [result for result in results if isinstance(result, BaseException)]
+    latencies.sort()
+    print(f"{args.sessions} sessions{' in pairs' if args.pvp else ''}, {len(latencies)} rounds in {seconds:.2f} s")
+    if latencies:
+        print(f"  {len(latencies) / seconds:,.0f} rounds/s")
+        print(f"  latency ms: p50 {percentile(latencies, 0.5) * 1000:.2f}, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.2f}, max {latencies[-1] * 1000:.2f}")
+    if failed:
+        print(f"  {len(failed)} sessions failed, first error: {failed[0]!r}")
+        return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Rock-Paper-Scissors server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--local", action="store_true", help="start a server on a free port for the run")
+    parser.add_argument("--opponent", default="random", help="computer strategy for --local")
+    parser.add_argument("-s", "--sessions", type=int, default=1000, help="concurrent sessions")
+    parser.add_argument("-r", "--rounds", type=int, default=100, help="rounds per session")
+    parser.add_argument("--pvp", action="store_true", help="match sessions against each other")
+    args = parser.parse_args(instrumentation.configure(argv))
+    if args.pvp and args.sessions % 2:
+        parser.error("--pvp needs an even number of sessions")
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
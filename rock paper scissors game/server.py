@@ -0,0 +1,187 @@
+import argparse
+import asyncio
+import os
+import random
+import signal
+import sys
+from contextlib import suppress
+
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from engine import CHOICES, STRATEGIES, TIE, WIN, outcome  # noqa: E402
+
+# Rock-Paper-Scissors over TCP, for many players at once. The protocol is one
+# line per command and one line per reply, with no typing animation:
+#
+#   rock | paper | scissors   play a round
+#   opponent NAME             play the computer using another strategy (resets the score)
+#   match                     wait for another player and play against them
+#   leave                     stop playing a player and go back to the computer
+#   score                     show the score
+#   exit                      quit
+#
+# A round is answered with: RESULT <your move> <their move> <win|loss|tie> <your score> <their score>
+# Against a player the reply comes once both have chosen.
+
+HOST = "127.0.0.1"
+PORT = 5050
+# Pending connections the listening socket holds while sessions are being accepted
+BACKLOG = 4096
+RESULT_WORDS = {TIE: "tie", WIN: "win"}
+
+# One connected player: their score and who they are playing
+class Session:
+    def __init__(self, writer, strategy):
+        self.writer = writer
+        self.opponent = STRATEGIES[strategy]()
+        self.partner = None
+        self.pending = None  # this player's move, waiting for the partner's
+        self.reset_score()
+
+    def reset_score(self):
+        self.user_score = 0
+        self.computer_score = 0
+
+    def send(self, line):
+        self.writer.write(line.encode() + b"\n")
+
+class GameServer:
+    def __init__(self, strategy="random"):
+        self.strategy = strategy
+        self.waiting = None  # session waiting in the matchmaking queue
+        self.sessions = 0
+        self.rounds = 0
+
+    # Function to serve one connection until it says exit or goes away
+    async def handle(self, reader, writer):
+        session = Session(writer, self.strategy)
+        self.sessions += 1
+        session.send("WELCOME choose rock, paper or scissors; or opponent NAME, match, leave, score, exit")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode(errors="replace").strip().lower().partition(" ")
+                if command == "exit":
+                    session.send("BYE")
+                    break
+                self.dispatch(session, command, argument.strip())
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # dropped connection, or a line longer than the stream limit
+        except asyncio.CancelledError:
+            pass  # the server is shutting down
+        finally:
+            self.sessions -= 1
+            self.leave(session)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    def dispatch(self, session, command, argument):
+        if command in CHOICES:
+            self.play(session, command)
+        elif command == "opponent":
+            if session.partner is not None:
+                session.send("ERROR playing a player; send leave first")
+            elif argument not in STRATEGIES:
+                session.send(f"ERROR unknown strategy; choose from {' '.join(STRATEGIES)}")
+            else:
+                session.opponent = STRATEGIES[argument]()
+                session.reset_score()
+                session.send(f"OK opponent {argument}")
+        elif command == "match":
+            self.match(session)
+        elif command == "leave":
+            self.leave(session)
+            session.send("OK opponent computer")
+        elif command == "score":
+            session.send(f"SCORE {session.user_score} {session.computer_score}")
+        else:
+            session.send("ERROR unknown command")
+
+    # Function to play a move against the computer, or hold it until the partner moves
+    @instrumentation.timed("rps.server_play")
+    def play(self, session, choice):
+        partner = session.partner
+        if partner is None:
+            computer_choice = CHOICES[session.opponent.choose(random)]
+            session.opponent.observe(CHOICES.index(computer_choice), CHOICES.index(choice))
+            self.finish_round(session, choice, computer_choice)
+        elif session.pending is not None:
+            session.send("ERROR waiting for the other player")
+        elif partner.pending is None:
+            session.pending = choice
+        else:
+            their_choice, partner.pending = partner.pending, None
+            self.finish_round(session, choice, their_choice)
+            self.finish_round(partner, their_choice, choice)
+
+    def finish_round(self, session, choice, their_choice):
+        result = outcome(choice, their_choice)
+        if result == WIN:
+            session.user_score += 1
+        elif result != TIE:
+            session.computer_score += 1
+        self.rounds += 1
+        session.send(f"RESULT {choice} {their_choice} {RESULT_WORDS.get(result, 'loss')} "
+                     f"{session.user_score} {session.computer_score}")
+
+    # Function to pair a player with the one already waiting, or make them wait
+    def match(self, session):
+        if session.partner is not None:
+            session.send("ERROR already playing a player")
+            return
+        waiting = self.waiting
+        if waiting is None or waiting is session:
+            self.waiting = session
+            session.send("WAITING")
+            return
+        self.waiting = None
+        session.partner, waiting.partner = waiting, session
+        for player in (session, waiting):
+            player.pending = None
+            player.reset_score()
+            player.send("MATCHED")
+
+    # Function to take a player out of the queue or their match
+    def leave(self, session):
+        if self.waiting is session:
+            self.waiting = None
+        partner = session.partner
+        if partner is not None:
+            partner.partner = partner.pending = None
+            partner.reset_score()
+            partner.send("PARTNER_LEFT")
+            session.partner = session.pending = None
+            session.reset_score()
+
+async def serve(host=HOST, port=PORT, strategy="random", backlog=BACKLOG):
+    server = GameServer(strategy)
+    listener = await asyncio.start_server(server.handle, host, port, backlog=backlog)
+    host, port = listener.sockets[0].getsockname()[:2]
+    print(f"Serving Rock-Paper-Scissors on {host}:{port}", flush=True)
+    async with listener:
+        serving = asyncio.ensure_future(listener.serve_forever())
+        # Stop cleanly when terminated (loadgen.py --local does this), so exit handlers
+        # still run; cancelling serve_forever closes the listener. Windows has no such handler.
+        with suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serving.cancel)
+        with suppress(asyncio.CancelledError):
+            await serving
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Rock-Paper-Scissors to many players over TCP.")
+    parser.add_argument("--host", default=HOST, help="address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=PORT, help="port to listen on (0 picks a free one)")
+    parser.add_argument("--opponent", choices=sorted(STRATEGIES), default="random",
+                        help="the computer's strategy for new sessions")
+    parser.add_argument("--backlog", type=int, default=BACKLOG, help="pending connections to queue")
+    args = parser.parse_args(instrumentation.configure(argv))
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.host, args.port, args.opponent, args.backlog))
+
+if __name__ == "__main__":
+    main()
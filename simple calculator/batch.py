@@ -0,0 +1,287 @@
+import argparse
+import ast
+import csv
+import os
+import re
+import sys
+import time
+from contextlib import suppress
+from itertools import islice
+
+try:
+    import numpy as np  # NumPy is only needed for batch mode
+except ImportError:
+    np = None
+
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from calculator import compile_expression  # noqa: E402
+
+# Batch mode: apply an operation or expression to whole columns of a data file
+#
+#   python batch.py data.csv -e "price * qty / (1 + rate)"        CSV in, CSV to stdout
+#   python batch.py data.csv --operation divide total count -o out.npy
+#   python batch.py data.npy -e "a ** 2 + b" --columns a b -o out.csv
+#   python batch.py data.bin -e "a / b" --columns a b              raw float64 rows
+#
+# Each row's result is written next to a division_by_zero flag (1 where a /, //
+# or % had a zero divisor, with the result left as nan) instead of the
+# "Error! Division by zero." message the menu prints.
+
+# Rows read, computed and written at a time
+CHUNK_SIZE = 100000
+# Headerless binary files, read as float64 rows with one value per --columns name
+RAW_EXTENSIONS = (".bin", ".raw", ".f64")
+MASK_COLUMN = "division_by_zero"
+# Bytes scanned at a time when counting the rows of a CSV file
+COUNT_BLOCK_SIZE = 1 << 20
+# Lines np.loadtxt skips (blank, or only a # comment), each matched with the newline before it
+SKIPPED_LINE = re.compile(rb"\n[ \t\r\f\v]*(?=[\n#]|\Z)")
+
+# The menu's operations, for --operation
+OPERATION_SYMBOLS = {
+    "add": "+",
+    "subtract": "-",
+    "multiply": "*",
+    "divide": "/",
+    "modulus": "%",
+    "exponentiation": "**",
+    "floor_division": "//",
+}
+
+# NumPy functions for each operator, by name since NumPy may not be installed
+ARRAY_OPERATORS = {
+    ast.Add: "add",
+    ast.Sub: "subtract",
+    ast.Mult: "multiply",
+    ast.Div: "true_divide",
+    ast.Mod: "remainder",
+    ast.Pow: "power",
+    ast.FloorDiv: "floor_divide",
+}
+ARRAY_UNARY_OPERATORS = {ast.UAdd: "positive", ast.USub: "negative"}
+# Operators whose zero divisors are flagged in the mask
+DIVIDING_OPERATORS = (ast.Div, ast.FloorDiv, ast.Mod)
+
+# Function to make sure NumPy is available before running a batch
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Batch mode requires NumPy. Install it with: pip install numpy")
+
+# Function to turn a syntax tree node into a function of (columns, mask) that
+# works on whole columns at once, marking rows divided by zero in mask
+def compile_array(node):
+    if isinstance(node, ast.Constant):
+        value = float(node.value)
+        return lambda columns, mask: value
+    if isinstance(node, ast.Name):
+        return lambda columns, mask, name=node.id: columns[name]
+    if isinstance(node, ast.UnaryOp):
+        ufunc = getattr(np, ARRAY_UNARY_OPERATORS[type(node.op)])
+        operand = compile_array(node.operand)
+        return lambda columns, mask: ufunc(operand(columns, mask))
+    ufunc = getattr(np, ARRAY_OPERATORS[type(node.op)])
+    left = compile_array(node.left)
+    right = compile_array(node.right)
+    if isinstance(node.op, DIVIDING_OPERATORS):
+        def checked(columns, mask):
+            x, y = left(columns, mask), right(columns, mask)
+            mask |= np.equal(y, 0)
+            return ufunc(x, y)
+        return checked
+    return lambda columns, mask: ufunc(left(columns, mask), right(columns, mask))
+
+# Function to compile an expression for batch mode; returns the column function
+# and the variable names it needs. The calculator's own compiler checks the
+# syntax first, so batch mode accepts exactly what expression mode accepts.
+def compile_batch(text):
+    _require_numpy()
+    expression = compile_expression(text)
+    try:
+        function = compile_array(ast.parse(text.strip(), mode="eval").body)
+    except (OverflowError, RecursionError, MemoryError):
+        raise ValueError(f"Invalid expression: {text}") from None  # e.g. a number too big for a float
+    return function, sorted(expression.variables)
+
+# Function to evaluate one chunk; returns the results and the division-by-zero mask
+@instrumentation.timed("calculator.batch_chunk")
+def evaluate_chunk(function, columns, rows):
+    mask = np.zeros(rows, dtype=bool)
+    with np.errstate(all="ignore"):
+        result = np.array(np.broadcast_to(function(columns, mask), rows), dtype=np.float64)
+    result[mask] = np.nan
+    return result, mask
+
+# Function to check that a file has every column the expression uses
+def check_columns(source, header, names):
+    missing = [name for name in names if name not in header]
+    if missing:
+        raise ValueError(f"Column not in {source}: {', '.join(missing)}")
+
+# Function to read the named columns of a CSV file with a header row, chunk by
+# chunk. The header is checked straight away, before anything is written.
+def read_csv_chunks(path, names, chunk_size=CHUNK_SIZE):
+    file = open(path, newline="")
+    try:
+        header = [column.strip() for column in next(csv.reader([file.readline()]))]
+        check_columns(path, header, names)
+    except BaseException:
+        file.close()
+        raise
+    return _csv_chunks(file, [header.index(name) for name in names] or [0], names, chunk_size)
+
+def _csv_chunks(file, indexes, names, chunk_size):
+    with file:
+        while True:
+            lines = list(islice(file, chunk_size))
+            if not lines:
+                return
+            data = np.loadtxt(lines, delimiter=",", usecols=indexes, ndmin=2, dtype=np.float64)
+            yield len(data), {name: data[:, index] for index, name in enumerate(names)}
+
+# Function to open a .npy file or raw float64 file as a (memory-mapped) array;
+# returns the array and its column names
+def open_array(path, columns=None):
+    if path.lower().endswith(RAW_EXTENSIONS):
+        if not columns:
+            raise ValueError("Raw binary files need --columns to name their columns")
+        return np.memmap(path, dtype=np.float64, mode="r").reshape(-1, len(columns)), columns
+    array = np.load(path, mmap_mode="r")
+    if array.dtype.names:
+        return array, list(array.dtype.names)
+    if array.ndim == 1:
+        array = array.reshape(-1, 1)
+    if not columns or len(columns) != array.shape[1]:
+        raise ValueError(f"{path} has {array.shape[1]} columns; name each one with --columns")
+    return array, columns
+
+# Function to read the named columns of an array, chunk by chunk
+def read_array_chunks(array, header, names, chunk_size=CHUNK_SIZE):
+    check_columns("the array", header, names)
+    return _array_chunks(array, header, names, chunk_size)
+
+def _array_chunks(array, header, names, chunk_size):
+    for start in range(0, len(array), chunk_size):
+        chunk = array[start:start + chunk_size]
+        if array.dtype.names:
+            columns = {name: np.asarray(chunk[name], dtype=np.float64) for name in names}
+        else:
+            columns = {name: np.asarray(chunk[:, header.index(name)], dtype=np.float64) for name in names}
+        yield len(chunk), columns
+
+# Function to format a chunk as CSV lines; repr keeps every digit of each result
+def format_csv_chunk(result, mask):
+    cells = [None] * (2 * len(result))
+    cells[::2] = map(repr, result.tolist())
+    cells[1::2] = np.where(mask, ",1\n", ",0\n").tolist()
+    return "".join(cells)
+
+# Function to count the lines in a block of whole lines that np.loadtxt reads as rows
+def count_block_rows(lines):
+    return lines.count(b"\n") + 1 - len(SKIPPED_LINE.findall(b"\n" + lines))
+
+# Function to count the data rows of a CSV file, for sizing a .npy output. Like
+# np.loadtxt, blank lines and # comments are not rows.
+def count_csv_rows(path, block_size=COUNT_BLOCK_SIZE):
+    rows = 0
+    with open(path, "rb") as file:
+        file.readline()  # the header
+        rest = b""
+        for block in iter(lambda: file.read(block_size), b""):
+            lines, newline, rest = (rest + block).rpartition(b"\n")
+            if newline:
+                rows += count_block_rows(lines)
+        if rest:
+            rows += count_block_rows(rest)
+    return rows
+
+# Function to evaluate text over every row of path, streaming the results to
+# output (a .npy or .csv path, or "-" for CSV on stdout). Returns (rows, divisions by zero).
+def run_batch(path, text, output="-", columns=None, chunk_size=CHUNK_SIZE):
+    function, names = compile_batch(text)
+    if path.lower().endswith(".csv"):
+        total = count_csv_rows(path) if output.lower().endswith(".npy") else None
+        chunks = read_csv_chunks(path, names, chunk_size)
+    else:
+        array, header = open_array(path, columns)
+        total = len(array)
+        chunks = read_array_chunks(array, header, names, chunk_size)
+
+    if output == "-":
+        return write_csv(sys.stdout, function, chunks)
+
+    # Results go to a temporary file that replaces output only once every row is
+    # written, so a failed run never leaves a truncated file that looks complete
+    temp_output = output + ".tmp"
+    try:
+        if output.lower().endswith(".npy"):
+            counts = write_npy(temp_output, total, function, chunks)
+        else:
+            with open(temp_output, "w", newline="") as file:
+                counts = write_csv(file, function, chunks)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(temp_output)
+        raise
+    os.replace(temp_output, output)
+    return counts
+
+# Function to write the results as a .npy file of total (result, division_by_zero) rows
+def write_npy(path, total, function, chunks):
+    rows = zero_divisions = 0
+    results = np.lib.format.open_memmap(path, mode="w+", shape=(total,),
+                                        dtype=[("result", np.float64), (MASK_COLUMN, bool)])
+    for count, chunk in chunks:
+        result, mask = evaluate_chunk(function, chunk, count)
+        results["result"][rows:rows + count] = result
+        results[MASK_COLUMN][rows:rows + count] = mask
+        rows += count
+        zero_divisions += int(mask.sum())
+    results.flush()
+    del results  # unmap the file so it can be renamed on Windows
+    return rows, zero_divisions
+
+# Function to write the results as CSV lines to an open file
+def write_csv(file, function, chunks):
+    rows = zero_divisions = 0
+    file.write(f"result,{MASK_COLUMN}\n")
+    for count, chunk in chunks:
+        result, mask = evaluate_chunk(function, chunk, count)
+        file.write(format_csv_chunk(result, mask))
+        rows += count
+        zero_divisions += int(mask.sum())
+    return rows, zero_divisions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a calculator operation or expression to whole data columns.")
+    parser.add_argument("input", help="a .csv file with a header row, a .npy file, or raw float64 rows (.bin)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-e", "--expression", help="formula over column names, e.g. \"a * b / c\"")
+    group.add_argument("--operation", nargs=3, metavar=("NAME", "X", "Y"),
+                       help=f"one operation on two columns or numbers ({', '.join(OPERATION_SYMBOLS)})")
+    parser.add_argument("-o", "--output", default="-", help="a .csv or .npy file (default: CSV on stdout)")
+    parser.add_argument("--columns", nargs="+", help="names for the columns of a plain array or raw file")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per chunk")
+    args = parser.parse_args(instrumentation.configure(argv))
+
+    text = args.expression
+    if args.operation:
+        name, x, y = args.operation
+        if name not in OPERATION_SYMBOLS:
+            parser.error(f"unknown operation {name}; choose from {', '.join(OPERATION_SYMBOLS)}")
+        text = f"({x}) {OPERATION_SYMBOLS[name]} ({y})"
+
+    start = time.perf_counter()
+    try:
+        rows, zero_divisions = run_batch(args.input, text, args.output, args.columns, args.chunk_size)
+    except (ValueError, RuntimeError, OSError, OverflowError, MemoryError, KeyError) as error:
+        print(f"Error! {error}", file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - start
+    print(f"{rows} rows, {zero_divisions} divisions by zero, {seconds:.2f} s "
+          f"({rows / max(seconds, 1e-9):,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
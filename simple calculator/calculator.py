@@ -1,62 +1,202 @@
+import ast
+import os
+import re
+import sys
+from functools import lru_cache
+
+# The shared instrumentation module lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation  # noqa: E402
+from instrumentation import timed  # noqa: E402
+
+DIVISION_ERROR = "Error! Division by zero."
+
+@timed("calculator.add")
 def add(x, y):
     return x + y
 
+@timed("calculator.subtract")
 def subtract(x, y):
     return x - y
 
+@timed("calculator.multiply")
 def multiply(x, y):
     return x * y
 
+@timed("calculator.divide")
 def divide(x, y):
     if y == 0:
-        return "Error! Division by zero."
+        return DIVISION_ERROR
     return x / y
 
+@timed("calculator.modulus")
 def modulus(x, y):
     return x % y
 
+@timed("calculator.exponentiation")
 def exponentiation(x, y):
     return x ** y
 
+@timed("calculator.floor_division")
 def floor_division(x, y):
     if y == 0:
-        return "Error! Division by zero."
+        return DIVISION_ERROR
     return x // y
 
-print("Select operation:")
-print("1. Addition (+)")
-print("2. Subtraction (-)")
-print("3. Multiplication (*)")
-print("4. Division (/)")
-print("5. Modulus (%)")
-print("6. Exponentiation (**)")
-print("7. Floor Division (//)")
-
-while True:
-    choice = input("Enter choice (1/2/3/4/5/6/7): ")
-
-    if choice in ('1', '2', '3', '4', '5', '6', '7'):
-        num1 = float(input("Enter first number: "))
-        num2 = float(input("Enter second number: "))
-
-        if choice == '1':
-            print(f"Result: {num1} + {num2} = {add(num1, num2)}")
-        elif choice == '2':
-            print(f"Result: {num1} - {num2} = {subtract(num1, num2)}")
-        elif choice == '3':
-            print(f"Result: {num1} * {num2} = {multiply(num1, num2)}")
-        elif choice == '4':
-            print(f"Result: {num1} / {num2} = {divide(num1, num2)}")
-        elif choice == '5':
-            print(f"Result: {num1} % {num2} = {modulus(num1, num2)}")
-        elif choice == '6':
-            print(f"Result: {num1} ** {num2} = {exponentiation(num1, num2)}")
-        elif choice == '7':
-            print(f"Result: {num1} // {num2} = {floor_division(num1, num2)}")
-
-        next_calc = input("Do you want to perform another calculation? (yes/no): ")
-        if next_calc.lower() != 'yes':
-            print("Thanks for using the calculator!")
-            break
-    else:
-        print("Invalid Input. Please enter a valid choice.")
+# Compiled expressions kept for reuse, so evaluating a formula again with new
+# variable values skips parsing and compiling
+EXPRESSION_CACHE_SIZE = 256
+# "name = expression" in expression mode stores the result as a variable
+ASSIGNMENT = re.compile(r"^\s*([A-Za-z_]\w*)\s*=(?!=)(.*)$")
+
+# Operators allowed in expressions, each done by the matching function above
+OPERATORS = {
+    ast.Add: add,
+    ast.Sub: subtract,
+    ast.Mult: multiply,
+    ast.Div: divide,
+    ast.Mod: modulus,
+    ast.Pow: exponentiation,
+    ast.FloorDiv: floor_division,
+}
+UNARY_OPERATORS = {ast.UAdd: lambda x: +x, ast.USub: lambda x: -x}
+
+# Function to turn a syntax tree node into a Python function of the variables
+# (or into a plain number when it does not depend on any). Only numbers,
+# variable names, brackets and the operators above are accepted; nothing is
+# ever passed to eval.
+def compile_node(node, names):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        names.add(node.id)
+        return lambda variables, name=node.id: variables[name]
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        operation = UNARY_OPERATORS[type(node.op)]
+        operand = compile_node(node.operand, names)
+        if not callable(operand):
+            return operation(operand)
+        return lambda variables: operation(operand(variables))
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+        # Bound once per compilation, so evaluation skips the timing wrapper while profiling is off
+        operation = instrumentation.current(OPERATORS[type(node.op)])
+        left = compile_node(node.left, names)
+        right = compile_node(node.right, names)
+        if not callable(left) and not callable(right):
+            try:
+                result = operation(left, right)
+                if not isinstance(result, str):
+                    return result
+            except (ZeroDivisionError, OverflowError):
+                pass  # leave the error for evaluation time
+        if not callable(left):
+            left = lambda variables, value=left: value
+        if not callable(right):
+            right = lambda variables, value=right: value
+        if OPERATORS[type(node.op)] in (divide, floor_division):
+            # These return the error message instead of raising; stop the whole expression there
+            def checked(variables):
+                result = operation(left(variables), right(variables))
+                if isinstance(result, str):
+                    raise ZeroDivisionError(result)
+                return result
+            return checked
+        return lambda variables: operation(left(variables), right(variables))
+    raise ValueError(f"Unsupported in expressions: {ast.unparse(node)}")
+
+# A compiled expression; evaluate it with a dict of variable values
+class Expression:
+    def __init__(self, text, function, variables):
+        self.text = text
+        self.function = function
+        self.variables = variables
+
+    @timed("calculator.evaluate")
+    def evaluate(self, variables=None):
+        try:
+            return self.function(variables or {})
+        except ZeroDivisionError:
+            return DIVISION_ERROR
+        except KeyError as error:
+            raise ValueError(f"No value for variable '{error.args[0]}'") from None
+
+# Function to parse and compile an expression, reusing earlier compilations
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text):
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+        names = set()
+        compiled = compile_node(tree.body, names)
+    except (SyntaxError, RecursionError, MemoryError):
+        raise ValueError(f"Invalid expression: {text}") from None
+    function = compiled if callable(compiled) else lambda variables, value=compiled: value
+    return Expression(text, function, frozenset(names))
+
+def evaluate(text, variables=None):
+    return compile_expression(text).evaluate(variables)
+
+def main():
+    # Variables set in expression mode, plus ans for the last result
+    variables = {}
+
+    print("Select operation:")
+    print("1. Addition (+)")
+    print("2. Subtraction (-)")
+    print("3. Multiplication (*)")
+    print("4. Division (/)")
+    print("5. Modulus (%)")
+    print("6. Exponentiation (**)")
+    print("7. Floor Division (//)")
+    print("8. Expression (e.g. 2 * (x + 3) / 4; set variables with x = 5)")
+
+    while True:
+        choice = input("Enter choice (1/2/3/4/5/6/7/8): ")
+
+        if choice == '8':
+            text = input("Enter expression: ")
+            assignment = ASSIGNMENT.match(text)
+            expression = assignment.group(2) if assignment else text
+            try:
+                result = evaluate(expression, variables)
+            except (ValueError, OverflowError) as error:
+                print(f"Error! {error}")
+            else:
+                if not isinstance(result, str):
+                    variables["ans"] = result
+                    if assignment:
+                        variables[assignment.group(1)] = result
+                print(f"Result: {assignment.group(1) if assignment else expression.strip()} = {result}")
+
+            next_calc = input("Do you want to perform another calculation? (yes/no): ")
+            if next_calc.lower() != 'yes':
+                print("Thanks for using the calculator!")
+                break
+        elif choice in ('1', '2', '3', '4', '5', '6', '7'):
+            num1 = float(input("Enter first number: "))
+            num2 = float(input("Enter second number: "))
+
+            if choice == '1':
+                print(f"Result: {num1} + {num2} = {add(num1, num2)}")
+            elif choice == '2':
+                print(f"Result: {num1} - {num2} = {subtract(num1, num2)}")
+            elif choice == '3':
+                print(f"Result: {num1} * {num2} = {multiply(num1, num2)}")
+            elif choice == '4':
+                print(f"Result: {num1} / {num2} = {divide(num1, num2)}")
+            elif choice == '5':
+                print(f"Result: {num1} % {num2} = {modulus(num1, num2)}")
+            elif choice == '6':
+                print(f"Result: {num1} ** {num2} = {exponentiation(num1, num2)}")
+            elif choice == '7':
+                print(f"Result: {num1} // {num2} = {floor_division(num1, num2)}")
+
+            next_calc = input("Do you want to perform another calculation? (yes/no): ")
+            if next_calc.lower() != 'yes':
+                print("Thanks for using the calculator!")
+                break
+        else:
+            print("Invalid Input. Please enter a valid choice.")
+
+if __name__ == "__main__":
+    instrumentation.configure()
+    main()